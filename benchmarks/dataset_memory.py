@@ -0,0 +1,59 @@
+"""Per-row memory footprint of list-backed vs compact Dataset storage.
+
+Usage: PYTHONPATH=. python benchmarks/dataset_memory.py [num_rows]
+"""
+
+import sys
+import tracemalloc
+from pathlib import Path
+
+from taskframe.dataset import UrlDataset
+from taskframe.storage import PathColumn
+
+
+def copy_str(value):
+    return value.encode().decode()
+
+
+def measure(build):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    obj = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return obj, after - before
+
+
+def main(num_rows):
+    urls = [f"https://cdn.example.com/images/{i:08d}.jpg" for i in range(num_rows)]
+    custom_ids = [f"record-{i}" for i in range(num_rows)]
+    labels = [{"classes": ["cat"]} if i % 2 else None for i in range(num_rows)]
+    paths = [f"/data/corpus/images/{i:08d}.jpg" for i in range(num_rows)]
+
+    cases = [
+        (
+            "url dataset (lists)",
+            lambda: UrlDataset(
+                [copy_str(x) for x in urls],
+                custom_ids=[copy_str(x) for x in custom_ids],
+                labels=[dict(x) if x else x for x in labels],
+            ),
+        ),
+        (
+            "url dataset (compact)",
+            lambda: UrlDataset(
+                urls, custom_ids=custom_ids, labels=labels, compact=True
+            ),
+        ),
+        ("file items (pathlib.Path)", lambda: [Path(x) for x in paths]),
+        ("file items (PathColumn)", lambda: PathColumn(paths)),
+    ]
+
+    print(f"{num_rows} rows")
+    for name, build in cases:
+        _, nbytes = measure(build)
+        print(f"{name:<28} {nbytes / num_rows:8.1f} bytes/row")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
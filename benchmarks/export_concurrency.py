@@ -0,0 +1,80 @@
+"""Export throughput against a local stub API, by number of concurrent pages.
+
+Usage: PYTHONPATH=. python benchmarks/export_concurrency.py [num_tasks] [latency_ms]
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class StubExportHandler(BaseHTTPRequestHandler):
+    num_tasks = 20000
+    latency = 0.05
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        offset = int(query["offset"][0])
+        end = min(offset + int(query["limit"][0]), self.num_tasks)
+        time.sleep(self.latency)
+        body = json.dumps(
+            {
+                "count": self.num_tasks,
+                "next": "..." if end < self.num_tasks else None,
+                "results": [
+                    {"id": str(i), "custom_id": f"record-{i}", "label": "cat"}
+                    for i in range(offset, end)
+                ],
+            }
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def main(num_tasks, latency_ms):
+    StubExportHandler.num_tasks = num_tasks
+    StubExportHandler.latency = latency_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubExportHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    os.environ["TASKFRAME_API_ENDPOINT"] = f"http://127.0.0.1:{server.server_port}"
+    import taskframe
+
+    tf = taskframe.Taskframe(id="benchmark")
+    print(f"{num_tasks} tasks, {latency_ms}ms per page, 500 tasks per page")
+    for prefetch, concurrency in [
+        (False, 1),
+        (True, 1),
+        (True, 2),
+        (True, 4),
+        (True, 8),
+        (True, 16),
+    ]:
+        start = time.perf_counter()
+        count = sum(
+            1 for _ in tf.iter_tasks(prefetch=prefetch, concurrency=concurrency)
+        )
+        seconds = time.perf_counter() - start
+        assert count == num_tasks
+        print(
+            f"prefetch={prefetch!s:<5} concurrency={concurrency:<3} "
+            f"{count / seconds:10.0f} tasks/s"
+        )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 20000,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 50,
+    )
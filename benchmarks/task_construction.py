@@ -0,0 +1,69 @@
+"""Construction time and memory per Task, from API rows.
+
+Usage: PYTHONPATH=. python benchmarks/task_construction.py [num_rows]
+"""
+
+import sys
+import time
+import tracemalloc
+
+from taskframe.task import Task
+
+
+class DictTask(Task):
+    """Task with a per-instance __dict__, like before Task had __slots__."""
+
+    def __init__(self, **kwargs):
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{field: data.get(field) for field in Task.__slots__})
+
+
+def measure(build):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    obj = build()
+    elapsed = time.perf_counter() - start
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return obj, elapsed, after - before
+
+
+def main(num_rows):
+    rows = [
+        {
+            "id": f"task-{i}",
+            "custom_id": f"record-{i}",
+            "taskframe_id": "taskframe-id",
+            "input_url": f"https://cdn.example.com/images/{i:08d}.jpg",
+            "input_type": "url",
+            "status": "finished",
+            "label": None,
+            "initial_label": None,
+            "priority": None,
+        }
+        for i in range(num_rows)
+    ]
+
+    cases = [
+        ("dict-backed, from_dict", lambda: [DictTask.from_dict(x) for x in rows]),
+        ("slotted, from_dict", lambda: [Task.from_dict(x) for x in rows]),
+        ("slotted, from_dicts", lambda: Task.from_dicts(rows)),
+    ]
+
+    print(f"{num_rows} rows")
+    for name, build in cases:
+        measure(build)  # warm up
+        _, elapsed, nbytes = measure(build)
+        print(
+            f"{name:<24} {elapsed * 1e6 / num_rows:6.2f} us/task"
+            f" {nbytes / num_rows:8.1f} bytes/task"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
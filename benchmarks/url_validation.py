@@ -0,0 +1,50 @@
+"""Throughput of utils.is_url and of input type inference.
+
+Usage: PYTHONPATH=. python benchmarks/url_validation.py [num_items]
+"""
+
+import re
+import sys
+import timeit
+
+from taskframe.dataset import infer_input_type
+from taskframe.utils import is_url
+
+# Previous implementation: re.IGNORECASE pattern, looked up through re.match.
+legacy_url_regex = re.compile(
+    r"^(?:http|ftp)s?://"
+    r"(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+(?:[A-Z]{2,6}\.?|[A-Z0-9-]{2,}\.?)|"
+    r"localhost|"
+    r"\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})"
+    r"(?::\d+)?"
+    r"(?:/?|[/?]\S+)$",
+    re.IGNORECASE,
+)
+
+
+def is_url_legacy(url):
+    return re.match(legacy_url_regex, url) is not None
+
+
+def throughput(func, items, number=3):
+    seconds = timeit.timeit(lambda: [func(item) for item in items], number=number)
+    return len(items) * number / seconds
+
+
+def main(num_items):
+    urls = [
+        f"https://cdn.example.com/images/{i:08d}.jpg?w=500" for i in range(num_items)
+    ]
+    texts = [f"review #{i}: this product is great" for i in range(num_items)]
+
+    for name, items in [("urls", urls), ("texts", texts)]:
+        for func in [is_url_legacy, is_url]:
+            rate = throughput(func, items)
+            print(f"{func.__name__:<20} {name:<6} {rate / 1e6:6.2f} M items/s")
+
+    seconds = timeit.timeit(lambda: infer_input_type(texts), number=100) / 100
+    print(f"infer_input_type     texts  {seconds * 1e6:6.1f} us per dataset")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
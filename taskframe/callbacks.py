@@ -0,0 +1,100 @@
+import hmac
+import json
+import queue
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import parse_qs, urlencode, urlparse
+
+
+class CallbackServer(ThreadingMixIn, HTTPServer):
+    """Threaded HTTP server, like http.server.ThreadingHTTPServer (Python 3.7+)."""
+
+    daemon_threads = True
+
+
+class CallbackHandler(BaseHTTPRequestHandler):
+    """Accepts POSTed JSON callbacks and passes them to the server's receiver."""
+
+    def do_POST(self):
+        receiver = self.server.receiver
+        query = parse_qs(urlparse(self.path).query)
+        if receiver.token is not None and not hmac.compare_digest(
+            query.get("token", [""])[0].encode(), receiver.token.encode()
+        ):
+            return self.send_error(403, "Invalid token")
+
+        try:
+            length = int(self.headers.get("Content-Length", ""))
+        except ValueError:
+            return self.send_error(411, "Missing Content-Length")
+        if length < 0:
+            return self.send_error(400, "Invalid Content-Length")
+        if length > receiver.max_body_size:
+            return self.send_error(413, "Callback too large")
+        try:
+            event = json.loads(self.rfile.read(length))
+        except ValueError:
+            return self.send_error(400, "Invalid JSON")
+        if not isinstance(event, dict):
+            return self.send_error(400, "Callback should be a JSON object")
+
+        try:
+            receiver.handle(event)
+        except Exception:
+            return self.send_error(500, "Callback handler failed")
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class CallbackReceiver(object):
+    """Embeddable HTTP server receiving the callbacks of a taskframe's callback_url.
+
+    Runs in a background thread. Each valid JSON callback is passed to handler,
+    or put on the events queue when there is no handler. With a token, only
+    requests with a matching token query parameter are accepted: use
+    receiver.url (or an equivalent public url) as the taskframe's callback_url.
+    """
+
+    max_body_size = 10 * 1000 * 1000  # 10MB
+
+    def __init__(self, host="127.0.0.1", port=0, token=None, handler=None):
+        self.token = token
+        self.handler = handler
+        self.events = queue.Queue()
+        self.server = CallbackServer((host, port), CallbackHandler)
+        self.server.receiver = self
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        query = f"?{urlencode({'token': self.token})}" if self.token else ""
+        return f"http://{host}:{port}/{query}"
+
+    def handle(self, event):
+        if self.handler:
+            self.handler(event)
+        else:
+            self.events.put(event)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread:
+            self.server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.server.server_close()
@@ -1,7 +1,13 @@
 import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
 
+from .utils import map_concurrently
+
 API_ENDPOINT = os.environ.get("TASKFRAME_API_ENDPOINT", "https://api.taskframe.ai")
 API_VERSION = os.environ.get("TASKFRAME_API_VERSION", "v1")
 API_URL = f"{API_ENDPOINT}/api/{API_VERSION}"
@@ -15,24 +21,210 @@ class ApiError(Exception):
         self.status_code = status_code
 
 
+def is_transient_error(error):
+    """Whether a failed request is worth retrying."""
+    if isinstance(error, ApiError):
+        return error.status_code == 429 or error.status_code >= 500
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+
+def with_retries(func, *args, retries=3, backoff=0.5, **kwargs):
+    """Calls func, retrying transient errors with an exponential backoff."""
+    for attempt in range(retries + 1):
+        try:
+            return func(*args, **kwargs)
+        except Exception as error:
+            if attempt == retries or not is_transient_error(error):
+                raise
+            time.sleep(backoff * 2**attempt)
+
+
+class ResponseCache(object):
+    """LRU cache of GET responses, fresh for ttl seconds.
+
+    Past their ttl, entries with an ETag are revalidated with If-None-Match
+    rather than downloaded again.
+    """
+
+    def __init__(self, ttl=5, max_size=1000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def key(url, params=None):
+        return url, tuple(
+            sorted(
+                (name, tuple(value) if isinstance(value, list) else value)
+                for name, value in (params or {}).items()
+            )
+        )
+
+    def get(self, key):
+        """Returns (response, is_fresh), or (None, False) when not cached."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, False
+            self._entries.move_to_end(key)
+        response, stored_at = entry
+        return response, time.monotonic() - stored_at < self.ttl
+
+    def set(self, key, response):
+        with self._lock:
+            self._entries[key] = (response, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, url=None):
+        """Drops the entries of url, its parent and child resources, or all."""
+        with self._lock:
+            if url is None:
+                self._entries.clear()
+                return
+            for key in list(self._entries):
+                if key[0].startswith(url) or url.startswith(key[0]):
+                    del self._entries[key]
+
+
 class Client(object):
+
+    # Keep-alive connections kept per host, enough for concurrent requests.
+    pool_maxsize = 32
+
     def __init__(self):
+        self.cache = None
         self.session = self.create_session()
         self._update_token()
         if os.environ.get("TASKFRAME_SSL_VERIFY") == "False":
             self.session.verify = False
 
     def create_session(self):
-        return requests.Session()
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=self.pool_maxsize)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def enable_cache(self, ttl=5, max_size=1000):
+        """Caches GET responses, see ResponseCache. Writes invalidate them."""
+        self.cache = ResponseCache(ttl=ttl, max_size=max_size)
+
+    def disable_cache(self):
+        self.cache = None
+
+    def invalidate(self, url=None):
+        """Drops the cached responses of url (e.g. "/tasks/abc/"), or all of them."""
+        if self.cache:
+            self.cache.invalidate(url)
+
+    def get(self, url, *args, **kwargs):
+        params = kwargs.get("params") or {}
+        # Pages of list endpoints aren't cached: exports walk them only once,
+        # and polls need fresh pages.
+        if (
+            self.cache is None
+            or args
+            or kwargs.get("stream")
+            or "offset" in params
+            or "limit" in params
+        ):
+            return self._send_request("get", url, *args, **kwargs)
+        return self._cached_get(url, **kwargs)
+
+    def put(self, url, *args, **kwargs):
+        self.invalidate(url)
+        return self._send_request("put", url, *args, **kwargs)
+
+    def post(self, url, *args, **kwargs):
+        self.invalidate(url)
+        return self._send_request("post", url, *args, **kwargs)
+
+    def patch(self, url, *args, **kwargs):
+        self.invalidate(url)
+        return self._send_request("patch", url, *args, **kwargs)
+
+    def _cached_get(self, url, **kwargs):
+        key = self.cache.key(url, kwargs.get("params"))
+        cached_response, is_fresh = self.cache.get(key)
+        if is_fresh:
+            return cached_response
+
+        etag = cached_response.headers.get("ETag") if cached_response else None
+        if etag:
+            headers = {**kwargs.get("headers", {}), "If-None-Match": etag}
+            kwargs = {**kwargs, "headers": headers}
+        response = self._send_request("get", url, **kwargs)
+        if response.status_code == 304 and cached_response is not None:
+            response = cached_response
+        self.cache.set(key, response)
+        return response
+
+    def iter_pages(
+        self,
+        url,
+        params=None,
+        page_size=100,
+        prefetch=True,
+        concurrency=1,
+        ordered=True,
+    ):
+        """Yields the results of a paginated list endpoint, one page at a time.
+
+        With prefetch, the next page is requested in a background thread while
+        the current one is being consumed. With a concurrency above 1, once the
+        first page gives the total count, the remaining pages are fetched by that
+        many concurrent requests, and yielded in order unless ordered is False.
+        """
+        params = params or {}
+
+        def fetch_page(offset):
+            return self.get(
+                url, params={**params, "offset": offset, "limit": page_size}
+            ).json()
 
-    def get(self, *args, **kwargs):
-        return self._send_request("get", *args, **kwargs)
+        if concurrency > 1:
+            page = fetch_page(0)
+            if isinstance(page, list) or page.get("count") is None:
+                yield from self._iter_next_pages(page, fetch_page, prefetch)
+                return
+            results = page.get("results", [])
+            yield results
+            if not (page.get("next") and results):
+                return
+            # The server may cap the page size: step by the size it actually uses.
+            offsets = range(len(results), page["count"], len(results))
+            for page in map_concurrently(fetch_page, offsets, concurrency, ordered):
+                yield page.get("results", [])
+            return
 
-    def put(self, *args, **kwargs):
-        return self._send_request("put", *args, **kwargs)
+        yield from self._iter_next_pages(fetch_page(0), fetch_page, prefetch)
 
-    def post(self, *args, **kwargs):
-        return self._send_request("post", *args, **kwargs)
+    def _iter_next_pages(self, page, fetch_page, prefetch):
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        try:
+            offset = 0
+            while True:
+                if isinstance(page, list):  # endpoint doesn't paginate
+                    yield page
+                    return
+                results = page.get("results", [])
+                has_next = bool(page.get("next") and results)
+                offset += len(results)
+                if has_next and executor:
+                    next_page = executor.submit(fetch_page, offset)
+                yield results
+                if not has_next:
+                    return
+                page = next_page.result() if executor else fetch_page(offset)
+        finally:
+            if executor:
+                executor.shutdown(wait=False)
 
     def _send_request(self, method, url, *args, **kwargs):
         url = f"{API_URL}{url}"
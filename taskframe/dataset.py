@@ -1,12 +1,25 @@
 import base64
+import copy
 import csv
 import json
 import mimetypes
 import random
+from array import array
+from collections import Counter
+from contextlib import closing
+from itertools import islice, repeat
 from pathlib import Path
 
 from .client import Client
-from .utils import is_url, remove_empty_values
+from .storage import JsonColumn, PathColumn, StringColumn, to_column
+from .utils import (
+    chunked,
+    compressed_openers,
+    is_url,
+    is_url_regex,
+    open_compressed,
+    remove_empty_values,
+)
 
 mimetypes.init()
 
@@ -19,17 +32,44 @@ def get_or_none(list_, idx):
     return list_[idx] if idx < len(list_) else None
 
 
+def parse_priority(value):
+    """Parses a priority, accepting integral floats like the "1.0" pandas writes."""
+    if value is None or value == "":
+        return None
+    try:
+        priority = float(value)
+    except (TypeError, ValueError):
+        priority = None
+    if priority is None or not priority.is_integer():
+        raise InvalidData(f"Priority should be an integer: {value}")
+    return int(priority)
+
+
 def open_file(*args, **kwargs):  # for easier mocked unit_tests
     return open(*args, **kwargs)
 
 
+# Longer strings can't be file paths, no need to ask the filesystem.
+MAX_PATH_LENGTH = 4096
+
+
 def guess_input_type(first_item, base_path=Path()):
-    if is_url(str(first_item)):
+    if isinstance(first_item, Path):
+        return Dataset.INPUT_TYPE_FILE
+    if not isinstance(first_item, str):
+        return Dataset.INPUT_TYPE_DATA
+    if is_url(first_item):
         return Dataset.INPUT_TYPE_URL
+    if (
+        not first_item
+        or len(first_item) > MAX_PATH_LENGTH
+        or "\n" in first_item
+        or "\0" in first_item
+        or "://" in first_item
+    ):
+        return Dataset.INPUT_TYPE_DATA
     try:
-        if (isinstance(first_item, Path) or isinstance(first_item, str)) and (
-            Path(first_item).exists() or (base_path / Path(first_item)).exists()
-        ):
+        if Path(first_item).exists() or (base_path / first_item).exists():
             return Dataset.INPUT_TYPE_FILE
     except OSError as exc:
         if exc.errno == 36:  # Filename too long: its probably raw data.
@@ -39,6 +79,136 @@ def guess_input_type(first_item, base_path=Path()):
     return Dataset.INPUT_TYPE_DATA
 
 
+def sample_items(items, sample_size):
+    """Returns up to sample_size items, evenly spread across a sized collection."""
+    try:
+        num_items = len(items)
+    except TypeError:
+        return list(islice(items, sample_size))
+    getter = items.iloc if hasattr(items, "iloc") else items  # pandas Series
+    step = max(1, num_items // sample_size)
+    return [getter[i] for i in range(0, num_items, step)[:sample_size]]
+
+
+def infer_input_type(items, base_path=Path(), sample_size=10):
+    """Guesses the input type of a dataset from a sample of its items.
+
+    The most common type among the sampled items wins.
+    """
+    input_types = Counter(
+        guess_input_type(item, base_path) for item in sample_items(items, sample_size)
+    )
+    if not input_types:
+        raise InvalidData("Empty dataset")
+    return input_types.most_common(1)[0][0]
+
+
+class JsonlRecords(object):
+    """Re-iterable (item, custom_id, label) records read lazily from a JSON Lines file.
+
+    The file is streamed on every iteration, so memory usage doesn't depend on
+    its size. Compressed files (.gz, .bz2, .xz) are decompressed on the fly.
+    Random access to an uncompressed file seeks to the record through an index
+    of line offsets (8 bytes per record), built on first use. Compressed files
+    can't seek: each random access decompresses the file up to the record.
+    """
+
+    def __init__(
+        self,
+        path,
+        input_field="input",
+        custom_id_field="custom_id",
+        label_field="label",
+    ):
+        self.path = Path(path)
+        self.input_field = input_field
+        self.custom_id_field = custom_id_field
+        self.label_field = label_field
+        self._len = None
+        self._offsets = None
+
+    @property
+    def compressed(self):
+        return self.path.suffix.lower() in compressed_openers
+
+    def __iter__(self):
+        with open_compressed(self.path) as jsonl_file:
+            for line_number, line in enumerate(jsonl_file, 1):
+                if line.strip():
+                    yield self._parse(line, line_number)
+
+    def _parse(self, line, line_number):
+        try:
+            record = json.loads(line)
+        except ValueError:
+            raise InvalidData(f"Invalid JSON on line {line_number}: {self.path}")
+        if not isinstance(record, dict) or self.input_field not in record:
+            raise InvalidData(
+                f"Missing field {self.input_field} on line {line_number}: {self.path}"
+            )
+        return (
+            record[self.input_field],
+            record.get(self.custom_id_field) if self.custom_id_field else None,
+            record.get(self.label_field) if self.label_field else None,
+        )
+
+    def check(self, check_item=None):
+        """Parses all the records, and calls check_item on each item.
+
+        The same pass builds the offset index of an uncompressed file, or
+        counts the records of a compressed one.
+        """
+        offsets = array("q")
+        offset = 0
+        with open_compressed(self.path, "rb") as jsonl_file:
+            for line_number, line in enumerate(jsonl_file, 1):
+                if line.strip():
+                    offsets.append(offset)
+                    item, _, _ = self._parse(line, line_number)
+                    if check_item is not None:
+                        check_item(item)
+                offset += len(line)
+        if self.compressed:
+            self._len = len(offsets)
+        else:
+            self._offsets = offsets
+
+    def __len__(self):
+        if not self.compressed:
+            return len(self._index())
+        if self._len is None:
+            with open_compressed(self.path) as jsonl_file:
+                self._len = sum(1 for line in jsonl_file if line.strip())
+        return self._len
+
+    def _index(self):
+        """Returns the offsets of the non-blank lines, scanned once."""
+        if self._offsets is None:
+            offsets = array("q")
+            offset = 0
+            with open(self.path, "rb") as jsonl_file:
+                for line in jsonl_file:
+                    if line.strip():
+                        offsets.append(offset)
+                    offset += len(line)
+            self._offsets = offsets
+        return self._offsets
+
+    def __getitem__(self, i):
+        if i < 0 or i >= len(self):
+            raise IndexError()
+        if self.compressed:
+            return next(islice(self, i, None))
+        with open(self.path, "rb") as jsonl_file:
+            jsonl_file.seek(self._index()[i])
+            line = jsonl_file.readline()
+        try:
+            return self._parse(line.decode("utf-8"), None)
+        except (InvalidData, UnicodeDecodeError):
+            # Stream the file to report the line number of the invalid record.
+            return next(islice(self, i, None))
+
+
 class CustomIdsLengthMismatch(Exception):
     def __init__(self, message="mismatch in length of dataset and custom_ids"):
         super().__init__(message)
@@ -49,6 +219,11 @@ class LabelsLengthMismatch(Exception):
         super().__init__(message)
 
 
+class PrioritiesLengthMismatch(Exception):
+    def __init__(self, message="mismatch in length of dataset and priorities"):
+        super().__init__(message)
+
+
 class MissingLabelsMismatch(Exception):
     def __init__(self, message="All labels should be defined"):
         super().__init__(message)
@@ -64,38 +239,190 @@ class Dataset(object):
 
     client = Client()
 
-    def __init__(self, items, ids=None, custom_ids=None, labels=None, **kwargs):
+    # Number of items sent per request by submit(). None sends a single request.
+    batch_size = None
+
+    # Columns are stored in compact storage.StringColumn subclasses instead of lists.
+    compact_storage = False
+    item_column_class = JsonColumn
+
+    # Positions of the rows of a view (see shard() and split()). None means all rows.
+    indices = None
+
+    # Per-row priorities: rows with a higher priority are submitted first.
+    priorities = ()
+
+    def __init__(
+        self,
+        items,
+        ids=None,
+        custom_ids=None,
+        labels=None,
+        priorities=None,
+        compact=False,
+        **kwargs,
+    ):
+        self.compact_storage = compact
 
         self.items = self.prepare_items(items, **kwargs)
 
         self.sanity_check(self.items, custom_ids, labels)
 
-        for item in self.items:
-            self.sanity_check_item(item)
+        self.sanity_check_items(self.items)
+
+        if priorities and len(priorities) != len(self.items):
+            raise PrioritiesLengthMismatch()
 
         self.custom_ids = custom_ids or []
         self.labels = labels or []
+        self.priorities = priorities or []
         self.ids = ids or []
 
+        if compact:
+            self.custom_ids = to_column(self.custom_ids, JsonColumn)
+            self.labels = to_column(self.labels, JsonColumn)
+            self.priorities = to_column(self.priorities, JsonColumn)
+            self.ids = to_column(self.ids)
+
     def __len__(self):
-        return len(self.items)
+        return len(self.positions)
 
     def __getitem__(self, i):
-        if i < 0 or i >= len(self.items):
+        if i < 0 or i >= len(self):
             raise IndexError()
+        position = self.positions[i]
         return (
-            self.items[i],
-            get_or_none(self.custom_ids, i),
-            get_or_none(self.labels, i),
+            self.items[position],
+            get_or_none(self.custom_ids, position),
+            get_or_none(self.labels, position),
             get_or_none(self.ids, i),
         )
 
-    def serialized_items(self, taskframe_id):
-        for item, custom_id, label, _id in self:
-            yield self.serialize_item(
-                item, taskframe_id, custom_id=custom_id, label=label
+    @property
+    def positions(self):
+        """Positions of the rows of this dataset in the underlying columns."""
+        if self.indices is None:
+            return range(len(self.items))
+        return self.indices
+
+    def iter_columns(self):
+        """Yields (item, custom_id, label) rows by zipping the columns."""
+        if self.indices is None:
+            return zip(
+                self.items, self.custom_ids or repeat(None), self.labels or repeat(None)
+            )
+        return (
+            (
+                self.items[position],
+                get_or_none(self.custom_ids, position),
+                get_or_none(self.labels, position),
+            )
+            for position in self.indices
+        )
+
+    def submission_order(self):
+        """Indices of the rows in submission order, by decreasing priority.
+
+        The sort is stable, and rows without a priority count as priority 0.
+        Without priorities, rows are submitted in order.
+        """
+        if not self.priorities:
+            return range(len(self))
+        positions, priorities = self.positions, self.priorities
+        return sorted(
+            range(len(self)),
+            key=lambda i: -(get_or_none(priorities, positions[i]) or 0),
+        )
+
+    def _submission_positions(self):
+        positions = self.positions
+        if not self.priorities:
+            return positions
+        return [positions[i] for i in self.submission_order()]
+
+    def shard(self, num_shards, index):
+        """Returns the index-th of num_shards interleaved views of this dataset.
+
+        Views share the columns of the dataset, only their ids are their own.
+        Sharding is deterministic: to distribute a submit across processes or
+        machines, each worker can rebuild the dataset and submit its own shard.
+        Rows are dealt in submission order, so each shard starts with its
+        highest priority rows.
+        """
+        if num_shards < 1 or not 0 <= index < num_shards:
+            raise ValueError("index should be in [0, num_shards)")
+        return self._view(self._submission_positions()[index::num_shards])
+
+    def split(self, chunk_size):
+        """Returns views of consecutive chunks of at most chunk_size rows.
+
+        Chunks follow the submission order: the first holds the highest
+        priority rows.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size should be positive")
+        positions = self._submission_positions()
+        return [
+            self._view(positions[start : start + chunk_size])
+            for start in range(0, len(positions), chunk_size)
+        ]
+
+    def merge_ids(self, views):
+        """Sets the ids of this dataset from the ids of its submitted views."""
+        positions = self.positions
+        if isinstance(positions, range):
+            index_of = positions.index
+        else:
+            index_of = {position: i for i, position in enumerate(positions)}.__getitem__
+
+        ids = list(self.ids) or [None] * len(self)
+        for view in views:
+            for position, id_ in zip(view.positions, view.ids):
+                ids[index_of(position)] = id_
+
+        complete = None not in ids
+        self.ids = to_column(ids) if self.compact_storage and complete else ids
+
+    def _view(self, indices):
+        view = copy.copy(self)
+        view.indices = indices
+        view.ids = []
+        return view
+
+    def serialized_items(self, taskframe_id, order=None):
+        """Yields the serialized rows, in the given order of row indices if any."""
+        serialize_item = self.serialize_item
+        if order is None or isinstance(order, range):
+            for item, custom_id, label in self.iter_columns():
+                yield serialize_item(
+                    item, taskframe_id, custom_id=custom_id, label=label
+                )
+            return
+        positions = self.positions
+        for i in order:
+            position = positions[i]
+            yield serialize_item(
+                self.items[position],
+                taskframe_id,
+                custom_id=get_or_none(self.custom_ids, position),
+                label=get_or_none(self.labels, position),
+                priority=get_or_none(self.priorities, position),
             )
 
+    def _set_submitted_ids(self, order, ids):
+        """Sets the ids of the rows from the ids received in submission order.
+
+        After a failed submit, ids only holds the ids of the batches created
+        before the failure: the rows not submitted keep a None id.
+        """
+        complete = len(ids) == len(order)
+        if not isinstance(order, range):
+            submitted_ids = ids
+            ids = [None] * len(order)
+            for i, id_ in zip(order, submitted_ids):
+                ids[i] = id_
+        self.ids = to_column(ids) if self.compact_storage and complete else ids
+
     def get_random(self):
         idx = random.randint(0, len(self) - 1)
         return self[idx]
@@ -115,18 +442,38 @@ class Dataset(object):
 
     @classmethod
     def from_list(
-        cls, items, input_type=None, custom_ids=None, labels=None, base_path=None
+        cls,
+        items,
+        input_type=None,
+        custom_ids=None,
+        labels=None,
+        base_path=None,
+        compact=False,
+        priorities=None,
     ):
 
-        input_type = input_type or guess_input_type(next(iter(items)))
+        input_type = input_type or infer_input_type(
+            items, base_path=Path(base_path) if base_path else Path()
+        )
 
         return cls.get_dataset_class(input_type)(
-            items, custom_ids=custom_ids, labels=labels, base_path=base_path
+            items,
+            custom_ids=custom_ids,
+            labels=labels,
+            priorities=priorities,
+            base_path=base_path,
+            compact=compact,
         )
 
     @classmethod
     def from_folder(
-        cls, path, custom_ids=None, labels=None, recursive=False, pattern="*"
+        cls,
+        path,
+        custom_ids=None,
+        labels=None,
+        recursive=False,
+        pattern="*",
+        compact=False,
     ):
         items = []
         path = Path(path)
@@ -142,6 +489,43 @@ class Dataset(object):
             input_type=cls.INPUT_TYPE_FILE,
             custom_ids=custom_ids,
             labels=labels,
+            compact=compact,
+        )
+
+    @classmethod
+    def get_streaming_dataset_class(cls, input_type):
+        dataset_class_map = {
+            "url": UrlStreamingDataset,
+            "data": DataStreamingDataset,
+        }
+        if input_type not in dataset_class_map.keys():
+            raise ValueError(
+                f'input type should be in {", ".join(dataset_class_map.keys())}'
+            )
+        return dataset_class_map[input_type]
+
+    @classmethod
+    def from_jsonl(
+        cls,
+        path,
+        input_type=None,
+        input_field="input",
+        custom_id_field="custom_id",
+        label_field="label",
+        batch_size=None,
+    ):
+        records = JsonlRecords(
+            path,
+            input_field=input_field,
+            custom_id_field=custom_id_field,
+            label_field=label_field,
+        )
+        if not input_type:
+            with closing(iter(records)) as record_iter:
+                input_type = infer_input_type(item for item, _, _ in record_iter)
+
+        return cls.get_streaming_dataset_class(input_type)(
+            records, batch_size=batch_size
         )
 
     @classmethod
@@ -153,35 +537,39 @@ class Dataset(object):
         base_path=None,
         custom_id_column=None,
         label_column=None,
+        compact=False,
+        priority_column=None,
     ):
-        items = []
-
-        custom_ids = [] if custom_id_column else None
-        labels = [] if label_column else None
+        new_column = StringColumn if compact else list
+        new_json_column = JsonColumn if compact else list
+        custom_ids = new_json_column() if custom_id_column else None
+        labels = new_json_column() if label_column else None
+        priorities = [] if priority_column else None
         csv_path = Path(csv_path)
+        base_path = Path(base_path) if base_path else csv_path.parents[0]
         with open(csv_path, newline="") as csvfile:
             reader = csv.DictReader(csvfile)
             if not column:
                 column = reader.fieldnames[0]
-            base_path = Path(base_path) if base_path else csv_path.parents[0]
-            first_item = next(iter(reader))[column]
-            input_type = input_type or guess_input_type(first_item, base_path=base_path)
-
-        with open(csv_path, newline="") as csvfile:
-            reader = csv.DictReader(csvfile)
-            items = []
+            items = new_column()
             for row in reader:
                 items.append(row[column])
                 if custom_id_column:
                     custom_ids.append(row[custom_id_column])
                 if label_column:
                     labels.append(row[label_column])
+                if priority_column:
+                    priorities.append(parse_priority(row[priority_column]))
+
+        input_type = input_type or infer_input_type(items, base_path=base_path)
         return cls.from_list(
             items,
             input_type=input_type,
             custom_ids=custom_ids,
             labels=labels,
             base_path=base_path,
+            compact=compact,
+            priorities=priorities,
         )
 
     @classmethod
@@ -193,31 +581,45 @@ class Dataset(object):
         base_path=None,
         custom_id_column=None,
         label_column=None,
+        compact=False,
+        priority_column=None,
     ):
         base_path = Path(base_path) if base_path else Path()
-        dataframe = dataframe.fillna("")
 
         if not column:
             column = dataframe.columns[0]
 
-        first_item = dataframe[column][0]
-        input_type = input_type or guess_input_type(first_item, base_path)
+        # Only touch the selected columns, and index them by position.
+        def get_column(name):
+            return dataframe[name].fillna("").reset_index(drop=True)
 
-        dataset = dataframe[column]
+        dataset = get_column(column)
+        input_type = input_type or infer_input_type(dataset, base_path)
 
         custom_ids = []
         labels = []
         if custom_id_column:
-            custom_ids = list(dataframe[custom_id_column])
+            custom_ids = get_column(custom_id_column).tolist()
 
         if label_column:
-            labels = list(dataframe[label_column])
+            labels = get_column(label_column).tolist()
+
+        priorities = []
+        if priority_column:
+            priorities = [parse_priority(x) for x in get_column(priority_column)]
 
         return cls.get_dataset_class(input_type)(
-            dataset, custom_ids=custom_ids, labels=labels, base_path=base_path
+            dataset,
+            custom_ids=custom_ids,
+            labels=labels,
+            priorities=priorities,
+            base_path=base_path,
+            compact=compact,
         )
 
-    def serialize_item(self, item, taskframe_id, custom_id=None, label=None):
+    def serialize_item(
+        self, item, taskframe_id, custom_id=None, label=None, priority=None
+    ):
         raise NotImplementedError()
 
     def sanity_check(self, items, custom_ids, labels):
@@ -228,24 +630,35 @@ class Dataset(object):
             raise LabelsLengthMismatch()
 
     def prepare_items(self, items, **kwargs):
+        if self.compact_storage:
+            return to_column(items, self.item_column_class)
         return items
 
+    def sanity_check_items(self, items):
+        for item in items:
+            self.sanity_check_item(item)
+
     def sanity_check_item(self, item):
         raise NotImplementedError()
 
     def serialize_item_preview(self, *args, **kwargs):
         return self.serialize_item(*args, **kwargs)
 
-    def submit(self, taskframe_id):
-        data = {"items": list(self.serialized_items(taskframe_id))}
-        resp = self.client.post(
-            f"/tasks/", params={"taskframe_id": taskframe_id}, json=data
-        )
-
-        resp_data = resp.json()
-
-        self.ids = [x["id"] for x in resp_data]
-        return
+    def submit(self, taskframe_id, batch_size=None):
+        batch_size = batch_size or self.batch_size
+        order = self.submission_order()
+        ids = []
+        try:
+            batches = chunked(self.serialized_items(taskframe_id, order), batch_size)
+            for batch in batches:
+                resp = self.client.post(
+                    f"/tasks/",
+                    params={"taskframe_id": taskframe_id},
+                    json={"items": batch},
+                )
+                ids.extend(x["id"] for x in resp.json())
+        finally:
+            self._set_submitted_ids(order, ids)
 
 
 class FileDataset(Dataset):
@@ -256,6 +669,8 @@ class FileDataset(Dataset):
     def prepare_items(self, items, base_path=None):
         base_path = Path(base_path) if base_path else None
         needs_preprend = base_path and (base_path / Path(items[0])).exists()
+        if self.compact_storage:
+            return PathColumn(items, base_path=base_path if needs_preprend else None)
         if needs_preprend:
             return [base_path / Path(item) for item in items]
         return items
@@ -268,7 +683,9 @@ class FileDataset(Dataset):
             raise InvalidData(f"File larger than 50MB: {str(item)}")
         # TODO: check that item matches input_type.
 
-    def serialize_item(self, item, taskframe_id, custom_id=None, label=None):
+    def serialize_item(
+        self, item, taskframe_id, custom_id=None, label=None, priority=None
+    ):
         path = Path(item)
         file_ = open_file(path, "rb")
         data = {
@@ -280,6 +697,8 @@ class FileDataset(Dataset):
             data["custom_id"] = (None, custom_id)
         if label:
             data["initial_label"] = (None, json.dumps(label))
+        if priority is not None:
+            data["priority"] = (None, str(priority))
 
         return data
 
@@ -300,34 +719,48 @@ class FileDataset(Dataset):
             }
         )
 
-    def submit(self, taskframe_id):
+    def submit(self, taskframe_id, batch_size=None):
         # INPUT_TYPE_FILE doesnt support batches, post items one by one.
-        resp_data = []
-        for data in self.serialized_items(taskframe_id):
-            resp = self.client.post(f"/tasks/", files=data)
-            resp_data.append(resp.json())
-        self.ids = [x["id"] for x in resp_data]
-        return
+        order = self.submission_order()
+        ids = []
+        try:
+            for data in self.serialized_items(taskframe_id, order):
+                resp = self.client.post(f"/tasks/", files=data)
+                ids.append(resp.json()["id"])
+        finally:
+            self._set_submitted_ids(order, ids)
 
 
 class UrlDataset(Dataset):
 
     input_type = "url"
+    item_column_class = StringColumn
 
-    def serialize_item(self, item, taskframe_id, custom_id=None, label=None):
+    def serialize_item(
+        self, item, taskframe_id, custom_id=None, label=None, priority=None
+    ):
         return remove_empty_values(
             {
                 "custom_id": custom_id,
                 "input_url": item,
                 "input_type": self.input_type,
                 "initial_label": label,
+                "priority": priority,
                 "taskframe_id": taskframe_id,
             }
         )
 
+    def sanity_check_items(self, items):
+        if not hasattr(items, "str"):
+            return super().sanity_check_items(items)
+        # pandas Series: validate all the urls at once.
+        invalid = ~items.astype(str).str.match(is_url_regex)
+        if invalid.any():
+            raise InvalidData(f"Not a URL: {items[invalid].iloc[0]}")
+
     def sanity_check_item(self, item):
         if not is_url(item):
-            raise InvalidData("Not a URL: {item}")
+            raise InvalidData(f"Not a URL: {item}")
         # TODO: check that item matches input_type.
 
 
@@ -335,13 +768,16 @@ class DataDataset(Dataset):
 
     input_type = "data"
 
-    def serialize_item(self, item, taskframe_id, custom_id=None, label=None):
+    def serialize_item(
+        self, item, taskframe_id, custom_id=None, label=None, priority=None
+    ):
         return remove_empty_values(
             {
                 "custom_id": custom_id,
                 "input_data": item,
                 "input_type": self.input_type,
                 "initial_label": label,
+                "priority": priority,
                 "taskframe_id": taskframe_id,
             }
         )
@@ -350,6 +786,65 @@ class DataDataset(Dataset):
         pass  # TODO: check that item matches input_type.
 
 
+class StreamingMixin(object):
+    """Dataset reading its rows from a re-iterable record source on demand.
+
+    Items are validated as they are streamed, and all of them before a submit
+    creates any task. They are then submitted in batches.
+    """
+
+    batch_size = 1000
+
+    def __init__(self, records, ids=None, batch_size=None):
+        self.records = records
+        self.ids = ids or []
+        if batch_size:
+            self.batch_size = batch_size
+
+    @property
+    def positions(self):
+        if self.indices is None:
+            return range(len(self.records))
+        return self.indices
+
+    def __getitem__(self, i):
+        if i < 0 or i >= len(self):
+            raise IndexError()
+        item, custom_id, label = self.records[self.positions[i]]
+        return item, custom_id, label, get_or_none(self.ids, i)
+
+    def __iter__(self):
+        for i, (item, custom_id, label) in enumerate(self.iter_columns()):
+            yield item, custom_id, label, get_or_none(self.ids, i)
+
+    def submit(self, taskframe_id, batch_size=None):
+        check_records = getattr(self.records, "check", None)
+        if check_records is not None and self.indices is None:
+            check_records(self.sanity_check_item)
+        else:
+            for _ in self.iter_columns():
+                pass
+        return super().submit(taskframe_id, batch_size=batch_size)
+
+    def iter_columns(self):
+        records = self.records
+        if self.indices is not None:
+            # Views of streamed records are always ranges.
+            indices = self.indices
+            records = islice(records, indices.start, indices.stop, indices.step)
+        for item, custom_id, label in records:
+            self.sanity_check_item(item)
+            yield item, custom_id, label
+
+
+class UrlStreamingDataset(StreamingMixin, UrlDataset):
+    pass
+
+
+class DataStreamingDataset(StreamingMixin, DataDataset):
+    pass
+
+
 class TrainingsetMixin(object):
     is_training = True
 
@@ -359,9 +854,11 @@ class TrainingsetMixin(object):
         if not all(labels):
             raise MissingLabelsMismatch()
 
-    def serialize_item(self, item, taskframe_id, custom_id=None, label=None):
+    def serialize_item(
+        self, item, taskframe_id, custom_id=None, label=None, priority=None
+    ):
         resp = super().serialize_item(
-            item, taskframe_id, custom_id=custom_id, label=label
+            item, taskframe_id, custom_id=custom_id, label=label, priority=priority
         )
         if self.input_type == "file":
             resp["is_training"] = (None, True)
@@ -0,0 +1,99 @@
+import hashlib
+import json
+import os
+import uuid
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from .utils import atomic_open
+
+
+class DownloadError(Exception):
+    """Downloaded file doesn't match its expected size"""
+
+
+def url_path(url):
+    """Returns url without its query string and fragment."""
+    return urlsplit(url)._replace(query="", fragment="").geturl()
+
+
+class InputCache(object):
+    """Content-addressed local cache of downloaded input files.
+
+    Files are stored once under objects/<sha256[:2]>/<sha256>, whatever the
+    number of urls pointing to them. index.json maps each download key to the
+    url (without its query string), sha256 and size of its content, so files
+    already cached are skipped. The key defaults to the url: signed or
+    expiring urls change on every export, so use a stable key (e.g. the task
+    id) for them.
+    """
+
+    chunk_size = 1 << 20
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.objects_path = self.path / "objects"
+        self.index_path = self.path / "index.json"
+        self.objects_path.mkdir(parents=True, exist_ok=True)
+        self.index = {}
+        if self.index_path.exists():
+            with open(self.index_path) as index_file:
+                self.index = json.load(index_file)
+
+    def object_path(self, sha256):
+        return self.objects_path / sha256[:2] / sha256
+
+    def get(self, url, key=None):
+        """Returns the local path of url if it is cached with its expected size."""
+        entry = self.index.get(key or url)
+        if entry is None or entry.get("url", url_path(url)) != url_path(url):
+            return None
+        path = self.object_path(entry["sha256"])
+        try:
+            if path.stat().st_size == entry["size"]:
+                return path
+        except FileNotFoundError:
+            pass
+        return None
+
+    def download(self, url, session, key=None):
+        """Downloads url into the cache unless present, returns its local path."""
+        path = self.get(url, key)
+        if path is not None:
+            return path
+
+        tmp_path = self.path / f".{uuid.uuid4().hex}.tmp"
+        sha256 = hashlib.sha256()
+        size = 0
+        try:
+            with session.get(url, stream=True) as response:
+                response.raise_for_status()
+                with open(tmp_path, "wb") as output_file:
+                    for chunk in response.iter_content(self.chunk_size):
+                        sha256.update(chunk)
+                        size += len(chunk)
+                        output_file.write(chunk)
+                expected_size = response.headers.get("Content-Length")
+                if response.headers.get("Content-Encoding"):
+                    expected_size = None  # the length of the encoded body
+            if expected_size is not None and int(expected_size) != size:
+                raise DownloadError(
+                    f"{url}: received {size} bytes, expected {expected_size}"
+                )
+            path = self.object_path(sha256.hexdigest())
+            path.parent.mkdir(exist_ok=True)
+            os.replace(tmp_path, path)
+        finally:
+            if tmp_path.exists():
+                os.remove(tmp_path)
+
+        self.index[key or url] = {
+            "url": url_path(url),
+            "sha256": sha256.hexdigest(),
+            "size": size,
+        }
+        return path
+
+    def save(self):
+        with atomic_open(self.index_path, "w") as index_file:
+            json.dump(self.index, index_file)
@@ -0,0 +1,339 @@
+"""Conversion of exported tasks (dicts from /tasks/export/) to typed columns."""
+
+import json
+import re
+from array import array
+from datetime import datetime, timedelta, timezone
+
+# Fields of the exported tasks, in csv column order.
+EXPORT_FIELDS = [
+    "id",
+    "custom_id",
+    "taskframe_id",
+    "input_data",
+    "input_file",
+    "input_url",
+    "input_type",
+    "status",
+    "initial_label",
+    "priority",
+    "created_at",
+    #
+    "label",
+    "assignment_id",
+    "worker",
+    "reviewer",
+    "started_at",
+    "finished_at",
+    "time_spent",
+]
+CATEGORY_FIELDS = ["input_type", "status", "worker", "reviewer"]
+JSON_FIELDS = ["initial_label", "label"]
+DATETIME_FIELDS = ["created_at", "started_at", "finished_at"]
+BOX_FIELDS = ["x", "y", "width", "height"]
+
+datetime_regex = re.compile(
+    r"(\d{4})-(\d\d)-(\d\d)[T ](\d\d):(\d\d)(?::(\d\d)(?:\.(\d*))?)?"
+    r"\s*(Z|[+-]\d\d:?\d\d)?$"
+)
+duration_regex = re.compile(r"(?:(-?\d+) )?(\d+):(\d\d):(\d\d(?:\.\d*)?)$")
+
+
+def parse_datetime(value):
+    """Parses an ISO 8601 datetime from the API. Naive datetimes are assumed UTC."""
+    if value is None or value == "" or isinstance(value, datetime):
+        return value or None
+    match = datetime_regex.match(value.strip())
+    if not match:
+        raise ValueError(f"Invalid datetime: {value}")
+    year, month, day, hour, minute, second, fraction, tz = match.groups()
+    tzinfo = timezone.utc
+    if tz and tz != "Z":
+        sign = -1 if tz[0] == "-" else 1
+        tz = tz[1:].replace(":", "")
+        tzinfo = timezone(sign * timedelta(hours=int(tz[:2]), minutes=int(tz[2:])))
+    return datetime(
+        int(year),
+        int(month),
+        int(day),
+        int(hour),
+        int(minute),
+        int(second or 0),
+        int((fraction or "0")[:6].ljust(6, "0")),
+        tzinfo=tzinfo,
+    ).astimezone(timezone.utc)
+
+
+def parse_duration(value):
+    """Parses time_spent into seconds: a number, or a "[D ]HH:MM:SS[.ffffff]" string."""
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    match = duration_regex.match(value.strip())
+    if not match:
+        raise ValueError(f"Invalid duration: {value}")
+    days, hours, minutes, seconds = match.groups()
+    return (
+        int(days or 0) * 86400 + int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    )
+
+
+def to_text(value):
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value)
+
+
+def to_json(value):
+    return None if value is None else json.dumps(value)
+
+
+def to_int(value):
+    return None if value is None or value == "" else int(value)
+
+
+def arrow_schema(fields):
+    """Stable arrow schema of the given exported task fields.
+
+    Labels are JSON-encoded strings, since their shape depends on the task type.
+    Datetimes are UTC timestamps and time_spent is a number of seconds.
+    """
+    import pyarrow
+
+    def arrow_type(field):
+        if field in CATEGORY_FIELDS:
+            return pyarrow.dictionary(pyarrow.int32(), pyarrow.string())
+        if field in DATETIME_FIELDS:
+            return pyarrow.timestamp("us", tz="UTC")
+        if field == "priority":
+            return pyarrow.int64()
+        if field == "time_spent":
+            return pyarrow.float64()
+        return pyarrow.string()
+
+    return pyarrow.schema([(field, arrow_type(field)) for field in fields])
+
+
+def field_converter(field):
+    if field in DATETIME_FIELDS:
+        return parse_datetime
+    if field in JSON_FIELDS:
+        return to_json
+    if field == "time_spent":
+        return parse_duration
+    if field == "priority":
+        return to_int
+    return to_text
+
+
+def tasks_to_record_batch(tasks, schema):
+    """Converts a list of exported tasks to an arrow RecordBatch."""
+    import pyarrow
+
+    columns = []
+    for field in schema:
+        convert = field_converter(field.name)
+        values = [convert(task.get(field.name)) for task in tasks]
+        columns.append(pyarrow.array(values, type=field.type))
+    return pyarrow.RecordBatch.from_arrays(columns, schema=schema)
+
+
+def tasks_to_dataframe(tasks, fields):
+    """Converts a list of exported tasks to a typed pandas.DataFrame.
+
+    Fields missing from fields but present in the tasks are kept as objects.
+    """
+    import pandas
+
+    fields = list(fields) + [x for x in (tasks[0] if tasks else {}) if x not in fields]
+    columns = {}
+    for field in fields:
+        values = [task.get(field) for task in tasks]
+        if field in CATEGORY_FIELDS:
+            column = pandas.Categorical(values)
+        elif field in DATETIME_FIELDS:
+            column = pandas.to_datetime([parse_datetime(x) for x in values], utc=True)
+        elif field == "time_spent":
+            column = pandas.array([parse_duration(x) for x in values], dtype="float64")
+        elif field == "priority":
+            column = pandas.array([to_int(x) for x in values], dtype="Int64")
+        else:
+            column = pandas.array(values, dtype=object)
+        columns[field] = column
+    return pandas.DataFrame(columns, index=pandas.RangeIndex(len(tasks)))
+
+
+def concat_dataframes(frames):
+    """Concatenates typed task dataframes, keeping categorical columns categorical."""
+    import pandas
+
+    if len(frames) == 1:
+        return frames[0]
+    for field in CATEGORY_FIELDS:
+        if all(field in frame for frame in frames):
+            categories = sorted(
+                set().union(*(frame[field].cat.categories for frame in frames))
+            )
+            for frame in frames:
+                frame[field] = frame[field].cat.set_categories(categories)
+    return pandas.concat(frames, ignore_index=True)
+
+
+def decode_label(label):
+    """Decodes a label that was exported as a JSON string."""
+    if isinstance(label, str) and label[:1] in ("{", "["):
+        try:
+            return json.loads(label)
+        except ValueError:
+            pass
+    return label
+
+
+def _as_classes(value):
+    if value is None or value == "":
+        return []
+    if isinstance(value, (list, tuple)):
+        return [str(x) for x in value]
+    return [str(value)]
+
+
+def _flatten_fields(value, prefix=""):
+    for key, item in value.items():
+        if isinstance(item, dict):
+            yield from _flatten_fields(item, f"{prefix}{key}.")
+        else:
+            yield f"{prefix}{key}", item
+
+
+class LabelColumns(object):
+    """Columnar decoding of exported labels.
+
+    A label is a class name, a list of class names, or a dict with "classes",
+    "regions" (a list of dicts with their own classes and box coordinates) and
+    form fields. A "global" dict is read like the label itself. Rows are
+    appended task by task to flat buffers:
+
+    - class_matrix(): boolean (num_tasks, num_classes) one-hot array
+    - boxes(): float (num_regions, 4) array of x, y, width, height
+    - classes_frame(), regions_frame(), fields_frame(): pandas views of these,
+      keyed by task id.
+    """
+
+    def __init__(self, classes=None, box_fields=BOX_FIELDS):
+        self.box_fields = list(box_fields)
+        self.task_ids = []
+        self.class_names = []
+        self._class_positions = {}
+        self._class_rows = array("q")
+        self._class_columns = array("q")
+        self.fields = {}
+        self.region_task_ids = []
+        self.region_classes = []
+        self._boxes = array("d")
+        for name in classes or []:
+            self._class_position(name)
+
+    def __len__(self):
+        return len(self.task_ids)
+
+    def _class_position(self, name):
+        position = self._class_positions.get(name)
+        if position is None:
+            position = self._class_positions[name] = len(self.class_names)
+            self.class_names.append(name)
+        return position
+
+    def _add_classes(self, row, classes):
+        for name in classes:
+            self._class_rows.append(row)
+            self._class_columns.append(self._class_position(name))
+
+    def _add_fields(self, row, values):
+        for field, value in values:
+            column = self.fields.get(field)
+            if column is None:
+                column = self.fields[field] = []
+            column.extend([None] * (row + 1 - len(column)))
+            column[row] = value
+
+    def _add_region(self, task_id, region):
+        self.region_task_ids.append(task_id)
+        self.region_classes.append(
+            _as_classes(region.get("classes", region.get("class")))
+        )
+        for field in self.box_fields:
+            value = region.get(field)
+            self._boxes.append(float("nan") if value is None else float(value))
+
+    def append(self, task_id, label):
+        row = len(self.task_ids)
+        self.task_ids.append(task_id)
+        label = decode_label(label)
+        if not isinstance(label, dict):
+            self._add_classes(row, _as_classes(label))
+            return
+        for part in (label.get("global"), label):
+            if not isinstance(part, dict):
+                continue
+            self._add_classes(row, _as_classes(part.get("classes")))
+            for region in part.get("regions") or []:
+                self._add_region(task_id, region)
+            self._add_fields(
+                row,
+                (
+                    (field, value)
+                    for field, value in _flatten_fields(part)
+                    if field.split(".")[0] not in ("global", "classes", "regions")
+                ),
+            )
+
+    def extend(self, tasks):
+        for task in tasks:
+            self.append(task.get("id"), task.get("label"))
+
+    def class_matrix(self):
+        import numpy
+
+        matrix = numpy.zeros((len(self), len(self.class_names)), dtype=bool)
+        matrix[
+            numpy.frombuffer(self._class_rows, dtype=numpy.int64),
+            numpy.frombuffer(self._class_columns, dtype=numpy.int64),
+        ] = True
+        return matrix
+
+    def boxes(self):
+        import numpy
+
+        boxes = numpy.frombuffer(self._boxes, dtype=numpy.float64)
+        return boxes.reshape(-1, len(self.box_fields)).copy()
+
+    def classes_frame(self):
+        import pandas
+
+        return pandas.DataFrame(
+            self.class_matrix(),
+            index=pandas.Index(self.task_ids, name="task_id"),
+            columns=self.class_names,
+        )
+
+    def regions_frame(self):
+        import pandas
+
+        frame = pandas.DataFrame(self.boxes(), columns=self.box_fields)
+        frame.insert(0, "task_id", self.region_task_ids)
+        frame.insert(1, "classes", self.region_classes)
+        return frame
+
+    def fields_frame(self):
+        import pandas
+
+        columns = {
+            field: values + [None] * (len(self) - len(values))
+            for field, values in self.fields.items()
+        }
+        return pandas.DataFrame(
+            columns, index=pandas.Index(self.task_ids, name="task_id")
+        )
@@ -0,0 +1,113 @@
+import json
+import os
+from array import array
+from pathlib import Path
+
+
+def _json_default(obj):
+    # numpy scalars (e.g. values coming from a dataframe) expose .item()
+    if hasattr(obj, "item"):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class StringColumn(object):
+    """Compact sequence of strings.
+
+    Values are stored utf-8 encoded in a single buffer, delimited by an array of
+    end offsets: a row costs its encoded length plus 8 bytes, instead of a full
+    Python object and a list slot.
+    """
+
+    def __init__(self, values=()):
+        self._data = bytearray()
+        self._ends = array("Q")
+        self.extend(values)
+
+    def __len__(self):
+        return len(self._ends)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if i < 0 or i >= len(self):
+            raise IndexError()
+        start = self._ends[i - 1] if i else 0
+        return self.decode(self._data[start : self._ends[i]])
+
+    def __iter__(self):
+        start = 0
+        for end in self._ends:
+            yield self.decode(self._data[start:end])
+            start = end
+
+    def append(self, value):
+        self._data += self.encode(value)
+        self._ends.append(len(self._data))
+
+    def extend(self, values):
+        for value in values:
+            self.append(value)
+
+    @property
+    def nbytes(self):
+        return len(self._data) + self._ends.itemsize * len(self._ends)
+
+    def encode(self, value):
+        return str(value).encode("utf-8")
+
+    def decode(self, raw):
+        return raw.decode("utf-8")
+
+
+class JsonColumn(StringColumn):
+    """Compact sequence of JSON-serializable values, decoded lazily on access."""
+
+    def encode(self, value):
+        return json.dumps(value, default=_json_default).encode("utf-8")
+
+    def decode(self, raw):
+        return json.loads(raw)
+
+
+class PathColumn(StringColumn):
+    """Compact sequence of file paths sharing a single interned base path.
+
+    Only the part of each path relative to the base is stored. Without an
+    explicit base path, the longest common directory of the initial values is
+    used, and appending a path outside of it raises a ValueError.
+    """
+
+    def __init__(self, values=(), base_path=None):
+        if base_path is None and len(values):
+            prefix = os.path.commonprefix(
+                [min(map(str, values)), max(map(str, values))]
+            )
+            prefix = prefix[: prefix.rfind(os.sep) + 1]
+            self._prefix = prefix
+            base_path = prefix or None
+        else:
+            self._prefix = ""
+        self.base_path = Path(base_path) if base_path else None
+        super().__init__(values)
+
+    def encode(self, value):
+        value = str(value)
+        if not value.startswith(self._prefix):
+            raise ValueError(f"{value} is not under {self._prefix}")
+        return value[len(self._prefix) :].encode("utf-8")
+
+    def decode(self, raw):
+        relative_path = raw.decode("utf-8")
+        if self.base_path is None:
+            return Path(relative_path)
+        return self.base_path / relative_path
+
+
+def to_column(values, column_class=StringColumn, **kwargs):
+    """Converts values to the given column class, unless they already are one."""
+    if type(values) is column_class:
+        return values
+    return column_class(values, **kwargs)
@@ -0,0 +1,286 @@
+import json
+import sqlite3
+from datetime import timedelta, timezone
+from pathlib import Path
+
+from .export import EXPORT_FIELDS, parse_datetime
+from .utils import atomic_open, chunked
+
+
+def advance_cursor(cursor, tasks, cursor_field):
+    """Returns the latest of cursor and the cursor_field values of tasks."""
+    for task in tasks:
+        value = task.get(cursor_field)
+        if value and (cursor is None or parse_datetime(value) > parse_datetime(cursor)):
+            cursor = value
+    return cursor
+
+
+def lagged_cursor(cursor, lag):
+    """Returns cursor moved back by lag seconds, as a UTC ISO 8601 datetime.
+
+    Cursors are the latest value seen while walking pages that keep changing:
+    re-querying from lagged_cursor also fetches the tasks changed during the
+    walk, before that latest value.
+    """
+    if cursor is None or not lag:
+        return cursor
+    value = parse_datetime(cursor) - timedelta(seconds=lag)
+    return value.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+class SyncState(object):
+    """Cursor and merged results of the incremental exports of a taskframe.
+
+    The state is persisted as an append-only JSON Lines log: a header line,
+    then one line per received task and one line per cursor update. A sync
+    therefore only appends its changes, and the log is compacted once it holds
+    too many superseded task versions.
+    """
+
+    def __init__(self, path, taskframe_id=None, cursor_field="finished_at"):
+        self.path = Path(path)
+        self.taskframe_id = taskframe_id
+        self.cursor_field = cursor_field
+        self.cursor = None
+        self.tasks = {}
+        self.changed = []
+        self._num_logged = 0
+
+    def __repr__(self):
+        return f"<SyncState object [{self.taskframe_id} {self.cursor}]>"
+
+    @classmethod
+    def load(cls, path, taskframe_id=None, cursor_field="finished_at"):
+        state = cls(path, taskframe_id=taskframe_id, cursor_field=cursor_field)
+        if not state.path.exists():
+            return state
+
+        with open(state.path) as log_file:
+            lines = iter(log_file)
+            header = json.loads(next(lines))
+            if taskframe_id and header["taskframe_id"] != taskframe_id:
+                raise ValueError(
+                    f"{path} is the sync state of taskframe {header['taskframe_id']}"
+                )
+            state.taskframe_id = header["taskframe_id"]
+            state.cursor_field = header["cursor_field"]
+            for line in lines:
+                try:
+                    entry = json.loads(line)
+                except ValueError:  # interrupted write, the entries are re-synced.
+                    break
+                if "task" in entry:
+                    state.tasks[entry["task"]["id"]] = entry["task"]
+                    state._num_logged += 1
+                else:
+                    state.cursor = entry["cursor"]
+        return state
+
+    def merge(self, tasks):
+        """Merges changed tasks into the results, and advances the cursor.
+
+        Tasks identical to their merged version are ignored, so syncs can
+        re-fetch an overlapping window of tasks.
+        """
+        tasks = list(tasks)
+        self.changed = [task for task in tasks if self.tasks.get(task["id"]) != task]
+        for task in self.changed:
+            self.tasks[task["id"]] = task
+        cursor = advance_cursor(self.cursor, tasks, self.cursor_field)
+
+        if not self.path.exists() or self._num_logged > 2 * len(self.tasks) + 1000:
+            self.cursor = cursor
+            self.compact()
+            return
+
+        with open(self.path, "a") as log_file:
+            for task in self.changed:
+                log_file.write(json.dumps({"task": task}) + "\n")
+            if cursor != self.cursor:
+                log_file.write(json.dumps({"cursor": cursor}) + "\n")
+        self.cursor = cursor
+        self._num_logged += len(self.changed)
+
+    def compact(self):
+        """Rewrites the log with only the latest version of each task."""
+        with atomic_open(self.path, "w") as log_file:
+            header = {
+                "taskframe_id": self.taskframe_id,
+                "cursor_field": self.cursor_field,
+            }
+            log_file.write(json.dumps(header) + "\n")
+            for task in self.tasks.values():
+                log_file.write(json.dumps({"task": task}) + "\n")
+            log_file.write(json.dumps({"cursor": self.cursor}) + "\n")
+        self._num_logged = len(self.tasks)
+
+
+class TaskDatabase(object):
+    """Local SQLite mirror of the exported tasks of a taskframe.
+
+    Tasks are upserted by id, with indexes on status, custom_id and worker, so
+    the query helpers run locally. The sync cursor is kept in a meta table.
+    """
+
+    fields = EXPORT_FIELDS
+    json_fields = ["input_data", "initial_label", "label"]
+    indexed_fields = ["status", "custom_id", "worker"]
+
+    def __init__(self, path, taskframe_id=None, cursor_field="finished_at"):
+        self.path = path
+        self.connection = sqlite3.connect(str(path), check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+            columns = ", ".join(
+                f"{field} TEXT PRIMARY KEY" if field == "id" else field
+                for field in self.fields
+            )
+            self.connection.execute(f"CREATE TABLE IF NOT EXISTS tasks ({columns})")
+            for field in self.indexed_fields:
+                self.connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS tasks_{field} ON tasks ({field})"
+                )
+        stored_taskframe_id = self.get_meta("taskframe_id")
+        if taskframe_id and stored_taskframe_id not in (None, taskframe_id):
+            self.connection.close()
+            raise ValueError(f"{path} is the mirror of taskframe {stored_taskframe_id}")
+        self.taskframe_id = stored_taskframe_id or taskframe_id
+        self.cursor_field = self.get_meta("cursor_field") or cursor_field
+
+    def __repr__(self):
+        return f"<TaskDatabase object [{self.taskframe_id} {self.cursor}]>"
+
+    def __len__(self):
+        return self.count()
+
+    def close(self):
+        self.connection.close()
+
+    def get_meta(self, key):
+        row = self.connection.execute(
+            "SELECT value FROM meta WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    @property
+    def cursor(self):
+        return self.get_meta("cursor")
+
+    def upsert(self, tasks, chunk_size=1000):
+        """Inserts or replaces tasks by id, and advances the cursor.
+
+        Rows are committed chunk by chunk, but the cursor only once all the
+        tasks are stored: the tasks are not sorted by cursor_field, so an
+        interrupted upsert keeps the previous cursor and the next sync fetches
+        the remaining tasks again.
+        """
+        placeholders = ", ".join("?" for _ in self.fields)
+        query = f"INSERT OR REPLACE INTO tasks VALUES ({placeholders})"
+        meta_query = "INSERT OR REPLACE INTO meta VALUES (?, ?)"
+        meta = [
+            ("taskframe_id", self.taskframe_id),
+            ("cursor_field", self.cursor_field),
+        ]
+        cursor = self.cursor
+        for chunk in chunked(tasks, chunk_size):
+            cursor = advance_cursor(cursor, chunk, self.cursor_field)
+            with self.connection:
+                self.connection.executemany(query, map(self._to_row, chunk))
+                self.connection.executemany(meta_query, meta)
+        with self.connection:
+            self.connection.execute(meta_query, ("cursor", cursor))
+
+    def _to_row(self, task):
+        row = []
+        for field in self.fields:
+            value = task.get(field)
+            if field in self.json_fields:
+                value = None if value is None else json.dumps(value)
+            row.append(value)
+        return row
+
+    def _to_task(self, row):
+        task = dict(row)
+        for field in self.json_fields:
+            if task[field] is not None:
+                task[field] = json.loads(task[field])
+        return task
+
+    def _where(self, filters):
+        for field in filters:
+            if field not in self.fields:
+                raise ValueError(f"Unknown field: {field}")
+        filters = {k: v for k, v in filters.items() if v is not None}
+        if not filters:
+            return "", []
+        clause = " AND ".join(f"{field} = ?" for field in filters)
+        return f" WHERE {clause}", list(filters.values())
+
+    def filter(self, **filters):
+        """Returns the tasks matching all the given field values, e.g. status="finished"."""
+        where, params = self._where(filters)
+        rows = self.connection.execute(f"SELECT * FROM tasks{where}", params)
+        return [self._to_task(row) for row in rows]
+
+    def get(self, id=None, custom_id=None):
+        """Returns the task with the given id or custom_id, or None."""
+        tasks = self.filter(id=id, custom_id=custom_id) if id or custom_id else []
+        return tasks[0] if tasks else None
+
+    def count(self, **filters):
+        where, params = self._where(filters)
+        query = f"SELECT COUNT(*) FROM tasks{where}"
+        return self.connection.execute(query, params).fetchone()[0]
+
+    def count_by(self, field, **filters):
+        """Returns a dict of task counts per value of field, e.g. count_by("worker")."""
+        where, params = self._where(dict(filters, **{field: None}))
+        query = f"SELECT {field}, COUNT(*) FROM tasks{where} GROUP BY {field}"
+        return dict(self.connection.execute(query, params).fetchall())
+
+    def custom_ids(self, **filters):
+        """Returns the custom_ids of the tasks matching the filters."""
+        where, params = self._where(filters)
+        query = f"SELECT custom_id FROM tasks{where}"
+        return [row[0] for row in self.connection.execute(query, params)]
+
+
+class CustomIdIndex(object):
+    """Persistent local index of task ids by (taskframe_id, custom_id), in SQLite."""
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(str(path), check_same_thread=False)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS task_ids (taskframe_id TEXT,"
+                " custom_id TEXT, id TEXT, PRIMARY KEY (taskframe_id, custom_id))"
+            )
+
+    def close(self):
+        self.connection.close()
+
+    def get_many(self, taskframe_id, custom_ids, chunk_size=500):
+        """Returns a dict of the known task ids of custom_ids."""
+        ids = {}
+        for chunk in chunked(custom_ids, chunk_size):
+            placeholders = ", ".join("?" for _ in chunk)
+            rows = self.connection.execute(
+                "SELECT custom_id, id FROM task_ids WHERE taskframe_id = ?"
+                f" AND custom_id IN ({placeholders})",
+                [taskframe_id, *chunk],
+            )
+            ids.update(rows)
+        return ids
+
+    def add(self, taskframe_id, ids):
+        """Records a dict of task ids by custom_id."""
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO task_ids VALUES (?, ?, ?)",
+                ((taskframe_id, custom_id, id) for custom_id, id in ids.items()),
+            )
@@ -1,6 +1,12 @@
+import json
+from collections import defaultdict
 from pathlib import Path
 
-from .client import ApiError, Client
+import requests
+
+from .client import ApiError, Client, with_retries
+from .sync import CustomIdIndex
+from .utils import chunked, map_concurrently, remove_empty_values
 
 
 class InvalidParameter(Exception):
@@ -10,9 +16,31 @@ class InvalidParameter(Exception):
 
 class Task(object):
 
+    __slots__ = (
+        "id",
+        "custom_id",
+        "taskframe_id",
+        "input_url",
+        "input_data",
+        "input_file",
+        "input_type",
+        "label",
+        "initial_label",
+        "status",
+        "priority",
+    )
+
     client = Client()
 
     input_fields = ["input_url", "input_data", "input_file"]
+    updatable_fields = [
+        "custom_id",
+        "initial_label",
+        "input_url",
+        "input_data",
+        "input_file",
+        "priority",
+    ]
 
     def __init__(
         self,
@@ -54,7 +82,38 @@ class Task(object):
             f"/tasks/",
             params={"taskframe_id": taskframe_id, "offset": offset, "limit": limit},
         ).json()
-        return [cls.from_dict(api_data) for api_data in api_resp["results"]]
+        return cls.from_dicts(api_resp["results"])
+
+    @classmethod
+    def iter(
+        cls,
+        taskframe_id=None,
+        page_size=100,
+        prefetch=True,
+        status=None,
+        custom_id=None,
+        **filters,
+    ):
+        """Yields all the tasks of a taskframe, following the pages of /tasks/.
+
+        The next page is fetched in the background while the current one is
+        consumed, unless prefetch is False. status, custom_id and other keyword
+        arguments are passed to the API as filters.
+        """
+        if not taskframe_id:
+            raise InvalidParameter(f"Missing required parameter taskframe_id")
+
+        params = remove_empty_values(
+            {"taskframe_id": taskframe_id, "status": status, "custom_id": custom_id}
+        )
+        pages = cls.client.iter_pages(
+            "/tasks/",
+            params={**params, **filters},
+            page_size=page_size,
+            prefetch=prefetch,
+        )
+        for page in pages:
+            yield from cls.from_dicts(page)
 
     @classmethod
     def retrieve(cls, id=None, custom_id=None, taskframe_id=None):
@@ -77,6 +136,41 @@ class Task(object):
             raise InvalidParameter(f"Missing id or (custom_id,taskframe_id)")
         return cls.from_dict(api_data)
 
+    @classmethod
+    def retrieve_many(cls, custom_ids, taskframe_id, index_path=None, page_size=500):
+        """Returns a dict of task ids by custom_id, for the given custom_ids.
+
+        Instead of a request per custom_id, the tasks of the taskframe are
+        scanned page by page until all custom_ids are found. With an
+        index_path, the ids seen are kept in a local CustomIdIndex, and
+        custom_ids already indexed aren't looked up again. Custom ids without a
+        task are left out of the result.
+        """
+        custom_ids = list(custom_ids)
+        index = CustomIdIndex(index_path) if index_path else None
+        try:
+            ids = index.get_many(taskframe_id, custom_ids) if index else {}
+            missing = set(custom_ids).difference(ids)
+            if not missing:
+                return ids
+
+            pages = cls.client.iter_pages(
+                "/tasks/", params={"taskframe_id": taskframe_id}, page_size=page_size
+            )
+            for page in pages:
+                page_ids = {x["custom_id"]: x["id"] for x in page if x.get("custom_id")}
+                if index:
+                    index.add(taskframe_id, page_ids)
+                for custom_id in missing.intersection(page_ids):
+                    ids[custom_id] = page_ids[custom_id]
+                missing.difference_update(page_ids)
+                if not missing:
+                    break
+            return ids
+        finally:
+            if index:
+                index.close()
+
     @classmethod
     def create(
         cls,
@@ -89,15 +183,7 @@ class Task(object):
         priority=None,
     ):
 
-        input_params = [input_url, input_data, input_file]
-
-        if sum([bool(x) for x in input_params]) != 1:
-            raise InvalidParameter(
-                f"One and only one of the following parameters may be specified: input_url, input_data, input_file"
-            )
-
-        if not taskframe_id:
-            raise InvalidParameter(f"Missing required taskframe_id parameter")
+        cls._check_create_params(taskframe_id, input_url, input_data, input_file)
 
         api_params = cls(
             custom_id=custom_id,
@@ -112,20 +198,70 @@ class Task(object):
         api_data = cls.client.post("/tasks/", **api_params).json()
         return cls.from_dict(api_data)
 
+    @classmethod
+    def _check_create_params(cls, taskframe_id, input_url, input_data, input_file):
+        input_params = [input_url, input_data, input_file]
+
+        if sum([bool(x) for x in input_params]) != 1:
+            raise InvalidParameter(
+                f"One and only one of the following parameters may be specified: input_url, input_data, input_file"
+            )
+
+        if not taskframe_id:
+            raise InvalidParameter(f"Missing required taskframe_id parameter")
+
+    @classmethod
+    def bulk_create(cls, tasks, batch_size=500, concurrency=8):
+        """Creates the given unsaved tasks, returns the created tasks in input order.
+
+        Url and data tasks are posted batch_size at a time, using the batch form
+        of /tasks/. File tasks don't support batches and are posted one by one.
+        Up to concurrency requests are in flight at any time.
+        """
+        tasks = list(tasks)
+        batch_positions = defaultdict(list)
+        calls = []
+        for position, task in enumerate(tasks):
+            cls._check_create_params(
+                task.taskframe_id, task.input_url, task.input_data, task.input_file
+            )
+            if task.input_file:
+                calls.append((None, [position]))
+            else:
+                batch_positions[task.taskframe_id].append(position)
+        for taskframe_id, positions in batch_positions.items():
+            for batch in chunked(positions, batch_size):
+                calls.append((taskframe_id, batch))
+
+        def send(call):
+            taskframe_id, positions = call
+            if taskframe_id is None:
+                api_params = tasks[positions[0]].to_api_params()
+                try:
+                    return positions, [cls.client.post("/tasks/", **api_params).json()]
+                finally:
+                    api_params["files"]["input_file"][1].close()
+            items = [tasks[position].to_batch_item() for position in positions]
+            resp = cls.client.post(
+                "/tasks/", params={"taskframe_id": taskframe_id}, json={"items": items}
+            )
+            return positions, resp.json()
+
+        created = [None] * len(tasks)
+        for positions, api_data in map_concurrently(
+            send, calls, concurrency, ordered=False
+        ):
+            for position, data in zip(positions, api_data):
+                created[position] = cls.from_dict(data)
+        return created
+
     @classmethod
     def update(cls, id, **kwargs):
 
         existing_instance = cls.retrieve(id)
 
         for kwarg, value in kwargs.items():
-            if kwarg in [
-                "custom_id",
-                "initial_label",
-                "input_url",
-                "input_data",
-                "input_file",
-                "priority",
-            ]:
+            if kwarg in cls.updatable_fields:
                 setattr(existing_instance, kwarg, value)
 
             if kwarg in cls.input_fields and value:
@@ -140,6 +276,60 @@ class Task(object):
         api_data = cls.client.put(f"/tasks/{id}/", **api_params).json()
         return cls.from_dict(api_data)
 
+    @classmethod
+    def partial_update(cls, id, **kwargs):
+        """Updates only the given fields, in a single PATCH request.
+
+        Unlike update, the task isn't retrieved first, and its file isn't
+        uploaded again unless input_file is given.
+        """
+        for kwarg in kwargs:
+            if kwarg not in cls.updatable_fields:
+                raise InvalidParameter(f"Invalid parameter {kwarg}")
+
+        data = dict(kwargs)
+        for input_field in cls.input_fields:
+            if data.get(input_field):
+                # unset other input_fields
+                data["input_type"] = None
+                for other_input_field in cls.input_fields:
+                    if other_input_field != input_field:
+                        data[other_input_field] = (
+                            None if other_input_field == "input_file" else ""
+                        )
+
+        if not data.get("input_file"):
+            api_data = cls.client.patch(f"/tasks/{id}/", json=data).json()
+            return cls.from_dict(api_data)
+
+        path = Path(data.pop("input_file"))
+        # requests leaves None values out of multipart bodies.
+        data["input_type"] = "file"
+        if data.get("initial_label") is not None:
+            data["initial_label"] = json.dumps(data["initial_label"])
+        with open(path, "rb") as file_:
+            api_data = cls.client.patch(
+                f"/tasks/{id}/", files={"input_file": (path.name, file_)}, data=data
+            ).json()
+        return cls.from_dict(api_data)
+
+    @classmethod
+    def bulk_update(cls, updates, concurrency=8):
+        """Applies partial updates to many tasks, returns the updated tasks.
+
+        updates is a dict, or an iterable of pairs, of task ids and dicts of
+        fields to update, e.g. {task_id: {"priority": 10}}. Up to concurrency
+        PATCH requests are in flight at any time.
+        """
+        if isinstance(updates, dict):
+            updates = updates.items()
+
+        def update(item):
+            id, fields = item
+            return cls.partial_update(id, **fields)
+
+        return list(map_concurrently(update, updates, concurrency))
+
     def submit(self):
         if self.id:
             self.update(
@@ -161,6 +351,24 @@ class Task(object):
     def dispose(self):
         self.client.post(f"/tasks/{self.id}/dispose/")
 
+    @classmethod
+    def bulk_dispose(cls, ids, concurrency=8, retries=3):
+        """Disposes many tasks, returns a dict of outcomes by task id.
+
+        Up to concurrency requests are in flight at any time, and transient
+        failures (connection errors, 429 and 5xx responses) are retried. The
+        outcome of a task is None once disposed, or the error that prevented it.
+        """
+
+        def dispose(id):
+            try:
+                with_retries(cls.client.post, f"/tasks/{id}/dispose/", retries=retries)
+            except (ApiError, requests.RequestException) as error:
+                return id, error
+            return id, None
+
+        return dict(map_concurrently(dispose, ids, concurrency, ordered=False))
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -177,19 +385,43 @@ class Task(object):
 
     @classmethod
     def from_dict(cls, data):
+        return cls.from_dicts((data,))[0]
 
-        return cls(
-            id=data.get("id"),
-            custom_id=data.get("custom_id"),
-            taskframe_id=data.get("taskframe_id"),
-            input_url=data.get("input_url", ""),
-            input_data=data.get("input_data", ""),
-            input_file=data.get("input_file"),
-            input_type=data.get("input_type"),
-            label=data.get("label"),
-            initial_label=data.get("initial_label"),
-            status=data.get("status"),
-            priority=data.get("priority"),
+    @classmethod
+    def from_dicts(cls, rows):
+        """Builds tasks from a list of API dicts, without going through __init__."""
+        new = object.__new__
+        tasks = []
+        append = tasks.append
+        for data in rows:
+            task = new(cls)
+            get = data.get
+            task.id = get("id")
+            task.custom_id = get("custom_id")
+            task.taskframe_id = get("taskframe_id")
+            task.input_url = get("input_url", "")
+            task.input_data = get("input_data", "")
+            task.input_file = get("input_file")
+            task.input_type = get("input_type")
+            task.label = get("label")
+            task.initial_label = get("initial_label")
+            task.status = get("status")
+            task.priority = get("priority")
+            append(task)
+        return tasks
+
+    def to_batch_item(self):
+        """Item of a batch POST to /tasks/, in the form used by Dataset.submit."""
+        return remove_empty_values(
+            {
+                "custom_id": self.custom_id,
+                "input_url": self.input_url,
+                "input_data": self.input_data,
+                "input_type": self.input_type or ("url" if self.input_url else "data"),
+                "initial_label": self.initial_label,
+                "priority": self.priority,
+                "taskframe_id": self.taskframe_id,
+            }
         )
 
     def to_api_params(self):
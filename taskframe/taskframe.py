@@ -2,14 +2,27 @@ import csv
 import json
 import os
 import random
+import time
 from warnings import warn
 
+import requests
 from IPython.display import HTML, Javascript, display
 
 from .client import Client
 from .dataset import Dataset, Trainingset
+from .download import DownloadError, InputCache
+from .export import (
+    EXPORT_FIELDS,
+    LabelColumns,
+    arrow_schema,
+    concat_dataframes,
+    tasks_to_dataframe,
+    tasks_to_record_batch,
+)
+from .sync import SyncState, TaskDatabase, advance_cursor, lagged_cursor
+from .task import Task
 from .team_member import TeamMember
-from .utils import remove_empty_values
+from .utils import atomic_open, chunked, map_concurrently, remove_empty_values
 
 APP_ENDPOINT = os.environ.get("TASKFRAME_APP_ENDPOINT", "https://app.taskframe.ai")
 
@@ -59,6 +72,9 @@ class Taskframe(object):
         "iterator",
     ]
 
+    # Fields of the exported tasks, in csv column order.
+    export_fields = EXPORT_FIELDS
+
     def __init__(
         self,
         data_type=None,
@@ -243,7 +259,7 @@ class Taskframe(object):
             "num_tasks": api_data.get("num_tasks"),
             "num_pending_work": api_data.get("num_pending_work"),
             "num_pending_review": api_data.get("num_pending_review"),
-            "num_finished": api_data.get("num_pending_review"),
+            "num_finished": api_data.get("num_finished"),
         }
 
     @classmethod
@@ -346,57 +362,322 @@ class Taskframe(object):
 
     # Export methods #########################
 
-    def to_list(self):
-        resp = self.client.get(
-            f"/tasks/export/", params={"taskframe_id": self.id, "no_page": 1}
+    def iter_tasks(
+        self, page_size=500, prefetch=True, concurrency=1, ordered=True, **filters
+    ):
+        """Yields the exported tasks lazily, walking the paginated export.
+
+        While a page is consumed, the next one is fetched in the background
+        (unless prefetch is False). With a concurrency above 1, that many pages
+        are fetched in parallel; ordered=False yields them as they arrive.
+        Extra keyword arguments are passed to the API as filters
+        (e.g. status="finished", finished_at__gte="2020-01-01T00:00:00Z").
+        """
+        pages = self.client.iter_pages(
+            "/tasks/export/",
+            params={"taskframe_id": self.id, **filters},
+            page_size=page_size,
+            prefetch=prefetch,
+            concurrency=concurrency,
+            ordered=ordered,
         )
-        return resp.json()
+        for page in pages:
+            yield from page
 
-    def to_dataframe(self):
-        tasks = self.to_list()
+    def to_list(self):
+        return list(self.iter_tasks())
+
+    def iter_dataframes(self, chunksize=50000, page_size=500, concurrency=1):
+        """Yields the exported tasks as typed dataframes of up to chunksize rows."""
+        tasks = self.iter_tasks(page_size=page_size, concurrency=concurrency)
+        for chunk in chunked(tasks, chunksize):
+            yield tasks_to_dataframe(chunk, self.export_fields)
+
+    def to_dataframe(self, chunksize=None, page_size=500, concurrency=1):
+        """Returns the exported tasks as a typed pandas.DataFrame.
+
+        status, input_type, worker and reviewer are categoricals, datetimes are
+        UTC datetime columns and time_spent is a number of seconds. The frame is
+        built incrementally from the exported pages. With a chunksize, an
+        iterator of dataframes of up to chunksize rows is returned instead.
+        """
+        frames = self.iter_dataframes(
+            chunksize=chunksize or 50000, page_size=page_size, concurrency=concurrency
+        )
+        if chunksize:
+            return frames
+        frames = list(frames)
+        if not frames:
+            return tasks_to_dataframe([], self.export_fields)
+        return concat_dataframes(frames)
+
+    def flatten_labels(self, classes=None, page_size=500, concurrency=1):
+        """Returns the exported labels decoded into an export.LabelColumns.
+
+        Labels are appended as pages arrive. classes fixes the order of the
+        first class columns; classes found in the labels are appended after.
+        """
+        labels = LabelColumns(classes=classes)
+        labels.extend(self.iter_tasks(page_size=page_size, concurrency=concurrency))
+        return labels
+
+    def iter_finished(self, poll=5, timeout=None, max_poll=60, page_size=500, lag=60):
+        """Yields the tasks as they finish, until none is pending or timeout.
+
+        Polling stops once all the tasks are received, or once no task is
+        pending and the finished tasks reported by progress were all received.
+
+        Each poll only fetches the finished tasks whose finished_at is at most
+        lag seconds before the latest one already seen, and yields those not
+        yielded yet. Tasks finishing while a poll reads its pages are therefore
+        yielded by a later poll, as long as the poll takes less than lag
+        seconds. The polling interval starts at poll seconds and doubles after
+        each poll without new tasks, up to max_poll.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        cursor, seen_ids = None, set()
+        num_finished = 0
+        interval, settled = poll, False
+        while True:
+            filters = {"status": "finished"}
+            if cursor:
+                filters["finished_at__gte"] = lagged_cursor(cursor, lag)
+            tasks = [
+                task
+                for task in self.iter_tasks(page_size=page_size, **filters)
+                if task["id"] not in seen_ids
+            ]
+            if tasks:
+                cursor = advance_cursor(cursor, tasks, "finished_at")
+                seen_ids.update(task["id"] for task in tasks)
+                num_finished += len(tasks)
+                interval, settled = poll, False
+                yield from tasks
+            else:
+                progress = self.progress()
+                if num_finished >= (progress["num_tasks"] or 0):
+                    return
+                pending = (progress["num_pending_work"] or 0) + (
+                    progress["num_pending_review"] or 0
+                )
+                if (progress["num_finished"] or 0) > num_finished:
+                    # Tasks finished after the poll: fetch them without backoff.
+                    interval, settled = poll, False
+                elif not pending:
+                    # Tasks left unfinished (e.g. disposed) won't finish anymore,
+                    # once one more empty poll confirms none finished meanwhile.
+                    if settled:
+                        return
+                    interval, settled = poll, True
+                else:
+                    interval, settled = min(interval * 2, max_poll), False
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                time.sleep(min(interval, remaining))
+            else:
+                time.sleep(interval)
+
+    def iter_labels(self, page_size=500, concurrency=1):
+        """Yields (custom_id, label) pairs of the exported tasks."""
+        tasks = self.iter_tasks(page_size=page_size, concurrency=concurrency)
+        for task in tasks:
+            yield task.get("custom_id"), task.get("label")
+
+    def merge_to_dataframe(
+        self,
+        initial_dataframe,
+        custom_id_column,
+        chunksize=None,
+        page_size=500,
+        concurrency=1,
+    ):
+        """Adds the exported labels to initial_dataframe, joined on custom_id.
+
+        Only custom_id and label are kept from the export, in a label series
+        indexed by custom_id, and the rows are merged chunksize at a time.
+        initial_dataframe may also be an iterable of dataframes (e.g. from
+        pandas.read_csv(..., chunksize=...)). With a chunksize or an iterable,
+        an iterator of merged dataframes is returned instead of a dataframe.
+        """
         import pandas
 
-        return pandas.DataFrame(tasks)
+        custom_ids, labels = [], []
+        for custom_id, label in self.iter_labels(page_size, concurrency):
+            custom_ids.append(custom_id)
+            labels.append(label)
+        label_series = pandas.Series(
+            labels, index=pandas.Index(custom_ids, dtype=object), name="label"
+        )
+        del custom_ids, labels
 
-    def merge_to_dataframe(self, initial_dataframe, custom_id_column):
-        exported_dataframe = self.to_dataframe()
-        if "label" in initial_dataframe.columns:
-            initial_dataframe = initial_dataframe.drop("label", axis=1)
-        output_columns = list(initial_dataframe.columns) + ["label"]
-        return initial_dataframe.merge(
-            exported_dataframe, left_on=custom_id_column, right_on="custom_id"
-        )[output_columns]
+        frames = initial_dataframe
+        if isinstance(initial_dataframe, pandas.DataFrame):
+            if not chunksize:
+                merged = _merge_labels(
+                    initial_dataframe, custom_id_column, label_series
+                )
+                return merged.reset_index(drop=True)
+            frames = (
+                initial_dataframe.iloc[start : start + chunksize]
+                for start in range(0, len(initial_dataframe), chunksize)
+            )
+        return (
+            _merge_labels(frame, custom_id_column, label_series) for frame in frames
+        )
+
+    def to_csv(self, path, compression="infer", page_size=500, concurrency=1):
+        """Writes the exported tasks to a csv file, as pages arrive.
 
-    def to_csv(self, path):
-        tasks = self.to_list()
-        if not tasks:
+        The file is gzipped when compression is "gzip", or "infer" and path ends
+        with .gz. It is written to a temporary file first, and only renamed to
+        path once the export is complete.
+        """
+        tasks = self.iter_tasks(page_size=page_size, concurrency=concurrency)
+        first_task = next(tasks, None)
+        if first_task is None:
             raise ValueError("No data")
-        keys = [
-            "id",
-            "custom_id",
-            "taskframe_id",
-            "input_data",
-            "input_file",
-            "input_url",
-            "input_type",
-            "status",
-            "initial_label",
-            "priority",
-            "created_at",
-            #
-            "label",
-            "assignment_id",
-            "worker",
-            "reviewer",
-            "started_at",
-            "finished_at",
-            "time_spent",
-        ]
-        with open(path, "w") as output_file:
-            dict_writer = csv.DictWriter(output_file, keys)
+        if compression == "infer":
+            compression = "gzip" if str(path).endswith(".gz") else None
+        with atomic_open(
+            path, "wt", compress=compression == "gzip", newline=""
+        ) as output_file:
+            dict_writer = csv.DictWriter(output_file, self.export_fields)
             dict_writer.writeheader()
+            dict_writer.writerow(first_task)
             dict_writer.writerows(tasks)
 
+    def iter_record_batches(self, batch_size=50000, page_size=500, concurrency=1):
+        """Yields the exported tasks as arrow RecordBatches of up to batch_size rows."""
+        schema = arrow_schema(self.export_fields)
+        tasks = self.iter_tasks(page_size=page_size, concurrency=concurrency)
+        for batch in chunked(tasks, batch_size):
+            yield tasks_to_record_batch(batch, schema)
+
+    def to_arrow(self, page_size=500, concurrency=1):
+        """Returns the exported tasks as a typed pyarrow.Table (see export.arrow_schema)."""
+        import pyarrow
+
+        batches = self.iter_record_batches(page_size=page_size, concurrency=concurrency)
+        return pyarrow.Table.from_batches(
+            list(batches), schema=arrow_schema(self.export_fields)
+        )
+
+    def to_parquet(
+        self,
+        path,
+        row_group_size=50000,
+        compression="snappy",
+        page_size=500,
+        concurrency=1,
+    ):
+        """Writes the exported tasks to a parquet file, one row group at a time.
+
+        Rows are converted and written as pages arrive, so memory is bounded by
+        row_group_size. Like to_csv, the file is renamed to path once complete.
+        """
+        import pyarrow.parquet
+
+        schema = arrow_schema(self.export_fields)
+        batches = self.iter_record_batches(
+            batch_size=row_group_size, page_size=page_size, concurrency=concurrency
+        )
+        with atomic_open(path, "wb") as output_file:
+            with pyarrow.parquet.ParquetWriter(
+                output_file, schema, compression=compression
+            ) as writer:
+                for batch in batches:
+                    writer.write_batch(batch, row_group_size=row_group_size)
+
+    def sync(self, state_path, cursor_field="finished_at", page_size=500, lag=600):
+        """Incrementally exports the tasks changed since the previous sync.
+
+        The state file keeps the cursor (the latest cursor_field value seen) and
+        the merged results. Only tasks with cursor_field at most lag seconds
+        before the cursor are fetched, so a sync costs O(changes). The pages
+        change while they are read: the lag window re-fetches the tasks changed
+        during the previous sync, which are all received as long as a sync
+        takes less than lag seconds. Returns the SyncState: state.tasks maps
+        task ids to the latest exported tasks, state.changed lists the tasks
+        changed since the previous sync.
+        """
+        state = SyncState.load(
+            state_path, taskframe_id=self.id, cursor_field=cursor_field
+        )
+        state.taskframe_id = self.id
+        filters = {}
+        if state.cursor:
+            filters[f"{state.cursor_field}__gte"] = lagged_cursor(state.cursor, lag)
+        state.merge(self.iter_tasks(page_size=page_size, **filters))
+        return state
+
+    def sync_local(self, db_path, cursor_field="finished_at", page_size=500, lag=600):
+        """Incrementally updates a local SQLite mirror of the tasks.
+
+        Like sync, only tasks changed since the stored cursor (minus the lag
+        window) are fetched.
+        Returns the TaskDatabase, whose filter, count and count_by helpers
+        query the mirror locally.
+        """
+        database = TaskDatabase(
+            db_path, taskframe_id=self.id, cursor_field=cursor_field
+        )
+        filters = {}
+        if database.cursor:
+            filters[f"{database.cursor_field}__gte"] = lagged_cursor(
+                database.cursor, lag
+            )
+        database.upsert(self.iter_tasks(page_size=page_size, **filters))
+        return database
+
+    def download_inputs(self, dest_dir, concurrency=8, page_size=500):
+        """Downloads the input files of the tasks into a local InputCache.
+
+        Files are cached by task id, so signed or expiring urls don't defeat
+        the cache. Files already in the cache are skipped, and downloads run
+        with up to concurrency requests in flight. Returns a dict of outcomes
+        by task id: the local path of the file, or the error that prevented
+        its download. The cache keeps the successful downloads, so a new call
+        only retries the failed ones.
+        """
+        cache = InputCache(dest_dir)
+        # The files are not served by the API: don't send the API token.
+        session = self.client.create_session()
+        tasks = (
+            task
+            for task in self.iter_tasks(page_size=page_size)
+            if task.get("input_file")
+        )
+
+        def download(task):
+            try:
+                path = cache.download(task["input_file"], session, key=task["id"])
+                return task["id"], path
+            except (requests.RequestException, DownloadError, OSError) as error:
+                return task["id"], error
+
+        try:
+            return dict(map_concurrently(download, tasks, concurrency))
+        finally:
+            cache.save()
+            session.close()
+
+    def dispose_tasks(self, concurrency=8, retries=3, all=False, **filters):
+        """Disposes the tasks matching the filters, e.g. status="pending_work".
+
+        Disposing every task of the taskframe requires all=True. The matching
+        ids are collected first, so that disposals don't shift the pages being
+        read. Returns the outcomes of Task.bulk_dispose.
+        """
+        if not filters and not all:
+            raise InvalidParameter(
+                "Pass filters, or all=True to dispose all the tasks of the taskframe"
+            )
+        ids = [task.id for task in Task.iter(self.id, page_size=500, **filters)]
+        return Task.bulk_dispose(ids, concurrency=concurrency, retries=retries)
+
     def fetch_tasks(self):
         warn("Deprecated, use to_list instead")
         return self.to_list()
@@ -404,14 +685,31 @@ class Taskframe(object):
     # Dataset helper methods #########################
 
     def add_dataset_from_list(
-        self, items, input_type=None, custom_ids=None, labels=None
+        self,
+        items,
+        input_type=None,
+        custom_ids=None,
+        labels=None,
+        compact=False,
+        priorities=None,
     ):
         self.dataset = Dataset.from_list(
-            items, input_type=input_type, custom_ids=custom_ids, labels=labels
+            items,
+            input_type=input_type,
+            custom_ids=custom_ids,
+            labels=labels,
+            compact=compact,
+            priorities=priorities,
         )
 
     def add_dataset_from_folder(
-        self, path, custom_ids=None, labels=None, recursive=False, pattern="*"
+        self,
+        path,
+        custom_ids=None,
+        labels=None,
+        recursive=False,
+        pattern="*",
+        compact=False,
     ):
         self.dataset = Dataset.from_folder(
             path,
@@ -419,6 +717,7 @@ class Taskframe(object):
             labels=labels,
             recursive=recursive,
             pattern=pattern,
+            compact=compact,
         )
 
     def add_dataset_from_csv(
@@ -429,6 +728,8 @@ class Taskframe(object):
         base_path=None,
         custom_id_column=None,
         label_column=None,
+        compact=False,
+        priority_column=None,
     ):
         self.dataset = Dataset.from_csv(
             csv_path,
@@ -437,6 +738,8 @@ class Taskframe(object):
             base_path=base_path,
             custom_id_column=custom_id_column,
             label_column=label_column,
+            compact=compact,
+            priority_column=priority_column,
         )
 
     def add_dataset_from_dataframe(
@@ -447,6 +750,8 @@ class Taskframe(object):
         base_path=None,
         custom_id_column=None,
         label_column=None,
+        compact=False,
+        priority_column=None,
     ):
         self.dataset = Dataset.from_dataframe(
             dataframe,
@@ -455,6 +760,26 @@ class Taskframe(object):
             base_path=base_path,
             custom_id_column=custom_id_column,
             label_column=label_column,
+            compact=compact,
+            priority_column=priority_column,
+        )
+
+    def add_dataset_from_jsonl(
+        self,
+        path,
+        input_type=None,
+        input_field="input",
+        custom_id_field="custom_id",
+        label_field="label",
+        batch_size=None,
+    ):
+        self.dataset = Dataset.from_jsonl(
+            path,
+            input_type=input_type,
+            input_field=input_field,
+            custom_id_field=custom_id_field,
+            label_field=label_field,
+            batch_size=batch_size,
         )
 
     def add_trainingset_from_list(
@@ -582,6 +907,12 @@ class Taskframe(object):
         return TeamMember.list(taskframe_id=self.id)
 
 
+def _merge_labels(dataframe, custom_id_column, label_series):
+    if "label" in dataframe.columns:
+        dataframe = dataframe.drop("label", axis=1)
+    return dataframe.merge(label_series, left_on=custom_id_column, right_index=True)
+
+
 def _find_in_objects(items, key, value):
     try:
         return next(x for x in items if value in getattr(x, key, None) == value)
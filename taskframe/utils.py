@@ -1,18 +1,54 @@
+import bz2
+import gzip
+import lzma
+import os
 import re
+import uuid
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from itertools import islice
+from pathlib import Path
 
+# Case-insensitive through explicit character classes: re.IGNORECASE is noticeably
+# slower, and this regex runs once per item of url datasets.
 is_url_regex = re.compile(
-    r"^(?:http|ftp)s?://"  # http:// or https://
-    r"(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+(?:[A-Z]{2,6}\.?|[A-Z0-9-]{2,}\.?)|"  # domain...
-    r"localhost|"  # localhost...
+    r"^(?:[Hh][Tt][Tt][Pp]|[Ff][Tt][Pp])[Ss]?://"  # http:// or https://
+    r"(?:(?:[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?\.)+"  # domain...
+    r"(?:[A-Za-z]{2,6}\.?|[A-Za-z0-9-]{2,}\.?)|"
+    r"[Ll][Oo][Cc][Aa][Ll][Hh][Oo][Ss][Tt]|"  # localhost...
     r"\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})"  # ...or ip
     r"(?::\d+)?"  # optional port
-    r"(?:/?|[/?]\S+)$",
-    re.IGNORECASE,
+    r"(?:/?|[/?]\S+)$"
 )
+_match_url = is_url_regex.match
+_host_regex = re.compile(
+    r"(?:(?:[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?\.)+"
+    r"(?:[A-Za-z]{2,6}\.?|[A-Za-z0-9-]{2,}\.?)|"
+    r"[Ll][Oo][Cc][Aa][Ll][Hh][Oo][Ss][Tt]|"
+    r"\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})"
+    r"(?::\d+)?"
+)
+_url_schemes = ("https://", "http://")
+_valid_hosts = {}
+_max_hosts = 1024
 
 
 def is_url(url):
-    return re.match(is_url_regex, url) is not None
+    # Fast path for the common http(s)://host/path urls: the urls of a dataset
+    # share a few hosts, whose validity is memoized. A printable url without
+    # spaces has no whitespace, so its path matches the regex. Anything else
+    # goes through the full regex.
+    if url.startswith(_url_schemes):
+        host = url.split("/", 3)[2]
+        valid = _valid_hosts.get(host)
+        if valid is None:
+            if len(_valid_hosts) >= _max_hosts:
+                _valid_hosts.clear()
+            valid = _valid_hosts[host] = _host_regex.fullmatch(host) is not None
+        if valid and url.isprintable() and " " not in url:
+            return True
+    return _match_url(url) is not None
 
 
 def remove_empty_values(obj):
@@ -23,3 +59,77 @@ def remove_empty_values(obj):
             if v is not None and v != ""
         }
     return obj
+
+
+compressed_openers = {
+    ".gz": gzip.open,
+    ".bz2": bz2.open,
+    ".xz": lzma.open,
+    ".lzma": lzma.open,
+}
+
+
+def open_compressed(path, mode="rt", encoding="utf-8"):
+    """Opens a file, transparently decompressing it based on its suffix."""
+    opener = compressed_openers.get(Path(path).suffix.lower(), open)
+    if "b" in mode:
+        return opener(path, mode)
+    return opener(path, mode, encoding=encoding)
+
+
+@contextmanager
+def atomic_open(path, mode="w", compress=False, **kwargs):
+    """Opens a temporary file next to path, renamed to path once the block succeeds.
+
+    Readers never see a partially written file, and a failed write leaves any
+    previous file untouched.
+    """
+    path = Path(path)
+    tmp_path = path.parent / f".{path.name}.{uuid.uuid4().hex}.tmp"
+    opener = gzip.open if compress else open
+    try:
+        with opener(tmp_path, mode, **kwargs) as output_file:
+            yield output_file
+        os.replace(tmp_path, path)
+    except BaseException:
+        if tmp_path.exists():
+            os.remove(tmp_path)
+        raise
+
+
+def chunked(iterable, size):
+    """Yields lists of at most `size` items. A falsy size yields a single list."""
+    iterator = iter(iterable)
+    if not size:
+        yield list(iterator)
+        return
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def map_concurrently(func, iterable, concurrency=8, ordered=True):
+    """Like map(), but calls func from a pool of threads.
+
+    At most `concurrency` calls are in flight at any time, so the iterable is
+    consumed lazily. Results are yielded in input order unless ordered is False,
+    in which case they are yielded as soon as they are available.
+    """
+    iterator = iter(iterable)
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pending = deque(
+            executor.submit(func, arg) for arg in islice(iterator, concurrency)
+        )
+        while pending:
+            if ordered:
+                done = [pending.popleft()]
+            else:
+                done, not_done = wait(pending, return_when=FIRST_COMPLETED)
+                pending = deque(not_done)
+            for future in done:
+                result = future.result()
+                for arg in islice(iterator, 1):
+                    pending.append(executor.submit(func, arg))
+                yield result
@@ -1,10 +1,21 @@
-from unittest.mock import call, patch
+import gzip
+from pathlib import Path
+from unittest.mock import MagicMock, call, patch
 
 import pandas as pd
 import pytest
+import requests
 import taskframe
 from taskframe.client import API_URL
-from taskframe.dataset import CustomIdsLengthMismatch, MissingLabelsMismatch
+from taskframe.dataset import (
+    CustomIdsLengthMismatch,
+    InvalidData,
+    JsonlRecords,
+    infer_input_type,
+    MissingLabelsMismatch,
+    PrioritiesLengthMismatch,
+)
+from taskframe.storage import JsonColumn, PathColumn
 
 from .test_utils import custom_mock_open, mock_client, mock_open_func
 
@@ -314,3 +325,235 @@ class TestClass:
         self.tf.trainingset.client.session.post.assert_has_calls(
             self.training_calls, any_order=True
         )
+
+    def test_add_from_jsonl(self, tmp_path):
+        gz_path = tmp_path / "data.jsonl.gz"
+        with open("tests/data.jsonl", "rb") as src, gzip.open(gz_path, "wb") as dst:
+            dst.write(src.read())
+
+        self.tf.add_dataset_from_jsonl(gz_path, input_type="data", batch_size=2)
+
+        assert len(self.tf.dataset) == 3
+        assert self.tf.dataset[1] == ("this is terrible", "buzz", "negative", None)
+
+        self.tf.dataset.client = mock_client()
+        self.tf.dataset.client.session.post.return_value.json.side_effect = [
+            [{"id": "a"}, {"id": "b"}],
+            [{"id": "c"}],
+        ]
+        self.tf.submit()
+
+        self.tf.dataset.client.session.post.assert_has_calls(
+            [
+                call(
+                    f"{API_URL}/tasks/",
+                    params={"taskframe_id": self.tf.id},
+                    json={
+                        "items": [
+                            {
+                                "taskframe_id": self.tf.id,
+                                "custom_id": "fizz",
+                                "input_data": "this is great",
+                                "input_type": "data",
+                            },
+                            {
+                                "taskframe_id": self.tf.id,
+                                "custom_id": "buzz",
+                                "input_data": "this is terrible",
+                                "input_type": "data",
+                                "initial_label": "negative",
+                            },
+                        ]
+                    },
+                ),
+                call(
+                    f"{API_URL}/tasks/",
+                    params={"taskframe_id": self.tf.id},
+                    json={
+                        "items": [
+                            {
+                                "taskframe_id": self.tf.id,
+                                "custom_id": "foo",
+                                "input_data": "this is fine",
+                                "input_type": "data",
+                                "initial_label": "neutral",
+                            },
+                        ]
+                    },
+                ),
+            ],
+            any_order=True,
+        )
+        assert self.tf.dataset.ids == ["a", "b", "c"]
+
+    def test_jsonl_random_access(self, tmp_path):
+        records = JsonlRecords("tests/data.jsonl")
+        assert len(records) == 3
+        assert records[2] == ("this is fine", "foo", "neutral")
+        assert records[0] == ("this is great", "fizz", None)
+        with pytest.raises(IndexError):
+            records[3]
+
+        path = tmp_path / "invalid.jsonl"
+        path.write_text('{"input": "a"}\n\n{"input": \n')
+        with pytest.raises(InvalidData, match="line 3"):
+            JsonlRecords(path)[1]
+
+    def test_streamed_submit_validation(self, tmp_path):
+        path = tmp_path / "urls.jsonl"
+        path.write_text(
+            '{"input": "https://example.com/0.jpg"}\n'
+            '{"input": "https://example.com/1.jpg"}\n'
+            '{"input": "not a url"}\n'
+        )
+        dataset = taskframe.Dataset.from_jsonl(path, input_type="url", batch_size=2)
+        dataset.client = mock_client()
+        with pytest.raises(InvalidData, match="Not a URL: not a url"):
+            dataset.submit("dummy_id")
+        assert not dataset.client.session.post.called
+
+    def test_submit_failure_keeps_ids(self):
+        urls = [f"https://example.com/{i}.jpg" for i in range(3)]
+        dataset = taskframe.Dataset.from_list(urls, priorities=[1, 2, 3])
+        dataset.client = mock_client()
+        dataset.client.session.post.return_value.json.side_effect = [
+            [{"id": "c"}, {"id": "b"}],
+            requests.ConnectionError(),
+        ]
+        with pytest.raises(requests.ConnectionError):
+            dataset.submit("dummy_id", batch_size=2)
+        assert dataset.ids == [None, "b", "c"]
+
+    @patch("taskframe.dataset.open_file", custom_mock_open)
+    def test_add_from_csv_compact(self):
+        self.tf.add_dataset_from_csv(
+            "tests/img_paths.csv",
+            column="path",
+            custom_id_column="identifier",
+            label_column="label",
+            compact=True,
+        )
+
+        assert isinstance(self.tf.dataset.items, PathColumn)
+        assert isinstance(self.tf.dataset.custom_ids, JsonColumn)
+        assert self.tf.dataset[1] == (Path("tests/imgs/bar.jpg"), "bar", "cat", None)
+
+        self.tf.dataset.client = mock_client()
+        self.tf.submit()
+        self.tf.dataset.client.session.post.assert_has_calls(
+            self.calls_str_custom_id, any_order=True
+        )
+
+    def test_add_urls_from_dataframe_validation(self):
+        dataframe = pd.read_csv("tests/img_urls.csv")
+        dataframe.index = [10, 20]
+        self.tf.add_dataset_from_dataframe(dataframe, column="url")
+        assert self.tf.dataset[0][0] == self.urls[0]
+
+        dataframe.loc[20, "url"] = "not a url"
+        with pytest.raises(InvalidData, match="Not a URL: not a url"):
+            self.tf.add_dataset_from_dataframe(
+                dataframe, column="url", input_type="url"
+            )
+
+    def test_infer_input_type(self):
+        assert infer_input_type(self.urls + ["some text"]) == "url"
+        assert (
+            infer_input_type(["imgs/foo.jpg", "imgs/bar.jpg"], Path("tests")) == "file"
+        )
+        assert infer_input_type(["imgs/foo.jpg", "foo\nbar", 42]) == "data"
+        assert infer_input_type([Path("missing.jpg")]) == "file"
+
+        with pytest.raises(InvalidData):
+            infer_input_type([])
+
+    def test_shard_and_split(self):
+        urls = [f"https://example.com/{i}.jpg" for i in range(5)]
+        dataset = taskframe.Dataset.from_list(
+            urls, custom_ids=[f"id{i}" for i in range(5)], labels=list("abcde")
+        )
+
+        shards = [dataset.shard(2, index) for index in range(2)]
+        assert [len(shard) for shard in shards] == [3, 2]
+        assert shards[1][1] == (urls[3], "id3", "d", None)
+        assert shards[0].items is dataset.items
+
+        chunks = dataset.split(2)
+        assert [list(chunk.positions) for chunk in chunks] == [[0, 1], [2, 3], [4]]
+        assert [row[1] for row in chunks[1].shard(2, 1)] == ["id3"]
+
+        for shard in shards:
+            shard.client = mock_client()
+            shard.client.session.post.return_value.json.return_value = [
+                {"id": f"task{position}"} for position in shard.positions
+            ]
+            shard.submit(self.tf.id)
+            assert len(shard.client.session.post.call_args[1]["json"]["items"]) == len(
+                shard
+            )
+
+        dataset.merge_ids(shards)
+        assert dataset.ids == [f"task{i}" for i in range(5)]
+
+        with pytest.raises(ValueError):
+            dataset.shard(2, 2)
+
+    def test_priority_ordering(self):
+        urls = [f"https://example.com/{i}.jpg" for i in range(5)]
+        dataframe = pd.DataFrame(
+            {"url": urls, "priority": [1, None, 5, 1, 3]}, index=[10, 11, 12, 13, 14]
+        )
+        self.tf.add_dataset_from_dataframe(
+            dataframe, column="url", priority_column="priority"
+        )
+        dataset = self.tf.dataset
+        assert list(dataset.submission_order()) == [2, 4, 0, 3, 1]
+
+        def post(url, params, json):
+            response = MagicMock(status_code=200)
+            response.json.return_value = [
+                {"id": item["input_url"].split("/")[-1]} for item in json["items"]
+            ]
+            return response
+
+        dataset.client = mock_client()
+        dataset.client.session.post.side_effect = post
+        dataset.submit(self.tf.id, batch_size=2)
+
+        batches = [
+            c[1]["json"]["items"] for c in dataset.client.session.post.call_args_list
+        ]
+        assert [[x.get("priority") for x in batch] for batch in batches] == [
+            [5, 3],
+            [1, 1],
+            [None],
+        ]
+        assert dataset.ids == [f"{i}.jpg" for i in range(5)]
+
+        shards = [dataset.shard(2, index) for index in range(2)]
+        assert [list(shard.positions) for shard in shards] == [[2, 0, 1], [4, 3]]
+        for shard in shards:
+            shard.client = dataset.client
+            shard.submit(self.tf.id)
+        dataset.merge_ids(shards)
+        assert dataset.ids == [f"{i}.jpg" for i in range(5)]
+
+        with pytest.raises(PrioritiesLengthMismatch):
+            taskframe.Dataset.from_list(urls, priorities=[1, 2])
+
+    def test_priority_from_csv(self, tmp_path):
+        urls = [f"https://example.com/{i}.jpg" for i in range(3)]
+        pd.DataFrame({"url": urls, "priority": [1, None, 5]}).to_csv(
+            tmp_path / "urls.csv", index=False
+        )
+        dataset = taskframe.Dataset.from_csv(
+            tmp_path / "urls.csv", column="url", priority_column="priority"
+        )
+        assert list(dataset.priorities) == [1, None, 5]
+        assert list(dataset.submission_order()) == [2, 0, 1]
+
+        (tmp_path / "invalid.csv").write_text("url,priority\nhttps://a.com/b.jpg,1.5\n")
+        with pytest.raises(InvalidData):
+            taskframe.Dataset.from_csv(
+                tmp_path / "invalid.csv", column="url", priority_column="priority"
+            )
@@ -0,0 +1,45 @@
+import http.client
+from urllib.parse import urlparse
+
+import requests
+from taskframe.callbacks import CallbackReceiver
+
+
+class TestCallbackReceiver:
+    def test_receive(self):
+        event = {"id": "abcde", "status": "finished", "label": "label1"}
+
+        with CallbackReceiver(token="s3cret") as receiver:
+            response = requests.post(receiver.url, json=event)
+            assert response.status_code == 204
+            assert receiver.events.get(timeout=5) == event
+
+            url = receiver.url.split("?")[0]
+            assert requests.post(url, json=event).status_code == 403
+            assert requests.post(f"{url}?token=wrong", json=event).status_code == 403
+            assert requests.post(receiver.url, data="{not json").status_code == 400
+            assert requests.post(receiver.url, json=[event]).status_code == 400
+            assert requests.get(receiver.url).status_code == 501
+
+            url = urlparse(receiver.url)
+            connection = http.client.HTTPConnection(url.netloc, timeout=5)
+            connection.putrequest("POST", f"{url.path}?{url.query}")
+            connection.putheader("Content-Length", "-1")
+            connection.endheaders()
+            assert connection.getresponse().status == 400
+            connection.close()
+            assert receiver.events.empty()
+
+    def test_handler(self):
+        events = []
+
+        def handler(event):
+            if event.get("fail"):
+                raise ValueError()
+            events.append(event)
+
+        with CallbackReceiver(handler=handler) as receiver:
+            assert requests.post(receiver.url, json={"id": "a"}).status_code == 204
+            assert requests.post(receiver.url, json={"fail": 1}).status_code == 500
+
+        assert events == [{"id": "a"}]
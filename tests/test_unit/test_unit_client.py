@@ -0,0 +1,52 @@
+from unittest.mock import MagicMock
+
+from taskframe.client import API_URL, ResponseCache
+
+from .test_utils import mock_client
+
+
+class TestClient:
+    def test_cache(self, monkeypatch):
+        now = [0]
+        monkeypatch.setattr("taskframe.client.time.monotonic", lambda: now[0])
+
+        def get(url, params=None, headers=None):
+            not_modified = headers and headers.get("If-None-Match") == '"v1"'
+            return MagicMock(
+                status_code=304 if not_modified else 200, headers={"ETag": '"v1"'}
+            )
+
+        client = mock_client()
+        client.session.get.side_effect = get
+        client.enable_cache(ttl=5)
+
+        response = client.get("/tasks/abc/")
+        assert client.get("/tasks/abc/") is response
+        assert client.session.get.call_count == 1
+
+        now[0] = 10
+        assert client.get("/tasks/abc/") is response
+        client.session.get.assert_called_with(
+            f"{API_URL}/tasks/abc/", headers={"If-None-Match": '"v1"'}
+        )
+        assert client.session.get.call_count == 2
+
+        client.get("/tasks/", params={"taskframe_id": "tf", "status": ["a", "b"]})
+        assert len(client.cache) == 2
+        client.get("/tasks/", params={"taskframe_id": "tf", "offset": 0, "limit": 2})
+        assert len(client.cache) == 2
+        client.post("/tasks/abc/dispose/")
+        assert len(client.cache) == 0
+
+        client.get("/tasks/abc/")
+        client.invalidate()
+        client.get("/tasks/abc/")
+        assert client.session.get.call_count == 6
+
+    def test_cache_max_size(self):
+        cache = ResponseCache(ttl=60, max_size=2)
+        for url in ["/a/", "/b/", "/c/"]:
+            cache.set(cache.key(url), url)
+
+        assert cache.get(cache.key("/a/")) == (None, False)
+        assert cache.get(cache.key("/c/")) == ("/c/", True)
@@ -0,0 +1,98 @@
+from datetime import datetime, timezone
+
+import pytest
+from taskframe.export import (
+    LabelColumns,
+    arrow_schema,
+    parse_datetime,
+    parse_duration,
+)
+
+
+class TestExport:
+    def test_parse_datetime(self):
+        expected = datetime(2020, 1, 1, 12, 30, tzinfo=timezone.utc)
+
+        assert parse_datetime("2020-01-01T12:30:00.Z") == expected
+        assert parse_datetime("2020-01-01T12:30:00Z") == expected
+        assert parse_datetime("2020-01-01 14:30:00.000000+02:00") == expected
+        assert parse_datetime("2020-01-01T12:30:00.5").microsecond == 500000
+        assert parse_datetime(None) is None
+        with pytest.raises(ValueError):
+            parse_datetime("yesterday")
+
+    def test_parse_duration(self):
+        assert parse_duration(12) == 12.0
+        assert parse_duration("12.5") == 12.5
+        assert parse_duration("01:02:03.5") == 3723.5
+        assert parse_duration("1 00:00:01") == 86401.0
+        assert parse_duration(None) is None
+
+    def test_arrow_schema(self):
+        pyarrow = pytest.importorskip("pyarrow")
+
+        schema = arrow_schema(["id", "status", "created_at", "time_spent"])
+
+        assert schema.field("id").type == pyarrow.string()
+        assert pyarrow.types.is_dictionary(schema.field("status").type)
+        assert schema.field("created_at").type == pyarrow.timestamp("us", tz="UTC")
+        assert schema.field("time_spent").type == pyarrow.float64()
+
+    def test_label_columns(self):
+        labels = LabelColumns(classes=["dog"])
+        labels.extend(
+            [
+                {"id": "a", "label": "cat"},
+                {"id": "b", "label": ["cat", "dog"]},
+                {
+                    "id": "c",
+                    "label": {
+                        "global": {"classes": ["dog"]},
+                        "regions": [
+                            {
+                                "classes": ["eye"],
+                                "x": 1,
+                                "y": 2,
+                                "width": 3,
+                                "height": 4,
+                            },
+                            {"class": "nose", "x": 5, "y": 6, "width": 7, "height": 8},
+                        ],
+                        "form": {"quality": 3},
+                    },
+                },
+                {"id": "d", "label": None},
+            ]
+        )
+
+        assert labels.class_names == ["dog", "cat"]
+        assert labels.class_matrix().tolist() == [
+            [False, True],
+            [True, True],
+            [True, False],
+            [False, False],
+        ]
+        assert labels.boxes().tolist() == [[1, 2, 3, 4], [5, 6, 7, 8]]
+
+        regions = labels.regions_frame()
+        assert list(regions.task_id) == ["c", "c"]
+        assert list(regions.classes) == [["eye"], ["nose"]]
+
+        assert labels.classes_frame().loc["b"].tolist() == [True, True]
+        quality = labels.fields_frame()["form.quality"]
+        assert quality["c"] == 3
+        assert quality.isna().tolist() == [True, True, False, True]
+
+        labels = LabelColumns()
+        labels.extend(
+            [
+                {"id": "a", "label": {"global": {"q": 1}, "q": 2}},
+                {"id": "b", "label": {"q": 3}},
+            ]
+        )
+        assert labels.fields_frame()["q"].tolist() == [2, 3]
+
+        empty = LabelColumns()
+        assert empty.class_matrix().shape == (0, 0)
+        assert empty.boxes().shape == (0, 4)
+        assert len(empty.regions_frame()) == 0
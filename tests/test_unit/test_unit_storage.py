@@ -0,0 +1,51 @@
+from pathlib import Path
+
+import pytest
+from taskframe.storage import JsonColumn, PathColumn, StringColumn, to_column
+
+
+class TestStorage:
+    def test_string_column(self):
+        column = StringColumn(["foo", "", "bär"])
+
+        assert len(column) == 3
+        assert list(column) == ["foo", "", "bär"]
+        assert column[-1] == "bär"
+        assert column[1:] == ["", "bär"]
+        with pytest.raises(IndexError):
+            column[3]
+
+        column.append("fizz")
+        assert column[3] == "fizz"
+        assert column.nbytes == len("foobärfizz".encode()) + 4 * 8
+
+    def test_json_column(self):
+        column = JsonColumn([None, 42, "cat", {"classes": ["dog"]}])
+
+        assert list(column) == [None, 42, "cat", {"classes": ["dog"]}]
+
+    def test_path_column(self):
+        column = PathColumn(
+            ["tests/imgs/foo.jpg", Path("tests/imgs/subfolder/fizz.jpg")]
+        )
+
+        assert column.base_path == Path("tests/imgs")
+        assert list(column) == [
+            Path("tests/imgs/foo.jpg"),
+            Path("tests/imgs/subfolder/fizz.jpg"),
+        ]
+
+        column.append("tests/imgs/bar.jpg")
+        assert column[2] == Path("tests/imgs/bar.jpg")
+        with pytest.raises(ValueError):
+            column.append("/other/z.jpg")
+        assert len(column) == 3
+
+        column = PathColumn(["imgs/foo.jpg"], base_path="tests")
+        assert column[0] == Path("tests/imgs/foo.jpg")
+
+    def test_to_column(self):
+        column = StringColumn(["foo"])
+
+        assert to_column(column) is column
+        assert list(to_column(column, JsonColumn)) == ["foo"]
@@ -1,5 +1,9 @@
+from unittest.mock import MagicMock
+
+import pytest
 from taskframe import Task
 from taskframe.client import API_URL
+from taskframe.task import InvalidParameter
 
 from .test_utils import mock_client
 
@@ -87,3 +91,196 @@ class TestTaskClass:
                 "priority": None,
             },
         )
+
+    def test_bulk_create(self, tmp_path):
+        file_path = tmp_path / "img.jpg"
+        file_path.write_bytes(b"jpg")
+
+        def post(url, params=None, json=None, files=None, data=None):
+            response = MagicMock(status_code=200)
+            if files:
+                response.json.return_value = {"id": "file", "input_type": "file"}
+            else:
+                response.json.return_value = [
+                    dict(item, id=item["custom_id"]) for item in json["items"]
+                ]
+            return response
+
+        Task.client.session.post.reset_mock()
+        Task.client.session.post.side_effect = post
+
+        tasks = Task.bulk_create(
+            [
+                Task(
+                    taskframe_id="tf", custom_id="a", input_url="http://foo.com/a.jpg"
+                ),
+                Task(taskframe_id="tf", input_file=file_path),
+                Task(taskframe_id="tf", custom_id="b", input_data="text", priority=3),
+                Task(taskframe_id="tf", custom_id="c", input_data="text"),
+            ],
+            batch_size=2,
+            concurrency=2,
+        )
+        Task.client.session.post.side_effect = None
+
+        assert [task.id for task in tasks] == ["a", "file", "b", "c"]
+        assert Task.client.session.post.call_count == 3
+        Task.client.session.post.assert_any_call(
+            f"{API_URL}/tasks/",
+            params={"taskframe_id": "tf"},
+            json={
+                "items": [
+                    {
+                        "custom_id": "a",
+                        "input_url": "http://foo.com/a.jpg",
+                        "input_type": "url",
+                        "taskframe_id": "tf",
+                    },
+                    {
+                        "custom_id": "b",
+                        "input_data": "text",
+                        "input_type": "data",
+                        "priority": 3,
+                        "taskframe_id": "tf",
+                    },
+                ]
+            },
+        )
+
+        with pytest.raises(InvalidParameter):
+            Task.bulk_create([Task(taskframe_id="tf")])
+
+    def test_partial_update(self):
+        Task.client.session.get.reset_mock()
+        Task.client.session.patch.return_value.json.return_value = self.task_serialized
+
+        task = Task.partial_update(self.task.id, input_url="http://foo.com/b.jpg")
+
+        assert isinstance(task, Task)
+        Task.client.session.get.assert_not_called()
+        Task.client.session.patch.assert_called_with(
+            f"{API_URL}/tasks/{self.task.id}/",
+            json={
+                "input_url": "http://foo.com/b.jpg",
+                "input_type": None,
+                "input_data": "",
+                "input_file": None,
+            },
+        )
+
+        with pytest.raises(InvalidParameter):
+            Task.partial_update(self.task.id, label="foo")
+
+    def test_partial_update_file(self, tmp_path):
+        path = tmp_path / "b.jpg"
+        path.write_bytes(b"jpg")
+        Task.client.session.patch.return_value.json.return_value = self.task_serialized
+
+        Task.partial_update(self.task.id, input_file=str(path), priority=2)
+
+        kwargs = Task.client.session.patch.call_args[1]
+        assert kwargs["data"] == {
+            "priority": 2,
+            "input_type": "file",
+            "input_url": "",
+            "input_data": "",
+        }
+        assert kwargs["files"]["input_file"][0] == "b.jpg"
+
+    def test_bulk_update(self):
+        Task.client.session.patch.reset_mock()
+
+        tasks = Task.bulk_update(
+            {"id1": {"priority": 10}, "id2": {"initial_label": "foo"}}, concurrency=2
+        )
+
+        assert len(tasks) == 2
+        assert Task.client.session.patch.call_count == 2
+        Task.client.session.patch.assert_any_call(
+            f"{API_URL}/tasks/id1/", json={"priority": 10}
+        )
+        Task.client.session.patch.assert_any_call(
+            f"{API_URL}/tasks/id2/", json={"initial_label": "foo"}
+        )
+
+    def test_retrieve_many(self, tmp_path):
+        Task.client.session.get.reset_mock()
+        Task.client.session.get.return_value.json.side_effect = [
+            {
+                "count": 3,
+                "next": "...",
+                "results": [
+                    {"id": "id1", "custom_id": "a"},
+                    {"id": "id2", "custom_id": "b"},
+                ],
+            },
+            {"count": 3, "next": None, "results": [{"id": "id3", "custom_id": "c"}]},
+        ]
+
+        ids = Task.retrieve_many(
+            ["a", "c", "missing"], "dummy_tf_id", index_path=tmp_path / "ids.db"
+        )
+
+        assert ids == {"a": "id1", "c": "id3"}
+        assert Task.client.session.get.call_count == 2
+        Task.client.session.get.return_value.json.side_effect = None
+
+        ids = Task.retrieve_many(
+            ["a", "b"], "dummy_tf_id", index_path=tmp_path / "ids.db"
+        )
+
+        assert ids == {"a": "id1", "b": "id2"}
+        assert Task.client.session.get.call_count == 2
+
+    def test_iter(self):
+        Task.client.session.get.return_value.json.side_effect = [
+            {"count": 2, "next": "...", "results": [self.task_serialized]},
+            {"count": 2, "next": None, "results": [self.task_serialized]},
+        ]
+
+        tasks = list(Task.iter("dummy_tf_id", page_size=1, status="finished"))
+
+        assert len(tasks) == 2
+        assert all(isinstance(task, Task) for task in tasks)
+        Task.client.session.get.assert_called_with(
+            f"{API_URL}/tasks/",
+            params={
+                "taskframe_id": "dummy_tf_id",
+                "status": "finished",
+                "offset": 1,
+                "limit": 1,
+            },
+        )
+        Task.client.session.get.return_value.json.side_effect = None
+
+    def test_bulk_dispose(self, monkeypatch):
+        monkeypatch.setattr("taskframe.client.time.sleep", lambda seconds: None)
+        status_codes = {
+            "id1": [200],
+            "id2": [503, 502, 200],
+            "id3": [404],
+            "id4": [500] * 4,
+        }
+
+        def post(url):
+            id = url.split("/")[-3]
+            return MagicMock(status_code=status_codes[id].pop(0))
+
+        Task.client.session.post.side_effect = post
+
+        outcomes = Task.bulk_dispose(["id1", "id2", "id3", "id4"], retries=3)
+        Task.client.session.post.side_effect = None
+
+        assert outcomes["id1"] is None
+        assert outcomes["id2"] is None
+        assert outcomes["id3"].status_code == 404
+        assert outcomes["id4"].status_code == 500
+        assert status_codes == {"id1": [], "id2": [], "id3": [], "id4": []}
+
+    def test_from_dicts(self):
+        tasks = Task.from_dicts([self.task_serialized, {"id": "other_id"}])
+
+        assert [task.id for task in tasks] == ["dummy_task_id", "other_id"]
+        assert tasks[0].to_dict() == Task.from_dict(self.task_serialized).to_dict()
+        assert tasks[1].input_url == "" and tasks[1].input_file is None
+        assert not hasattr(tasks[0], "__dict__")
@@ -1,10 +1,17 @@
+from unittest.mock import MagicMock
+
 import pandas as pd
 import pytest
+import requests
 from taskframe.client import API_URL
+from taskframe.download import DownloadError
+from taskframe.export import concat_dataframes
+from taskframe.sync import SyncState, TaskDatabase
+from taskframe.task import Task
 from taskframe.taskframe import InvalidParameter, Taskframe
 from taskframe.team_member import TeamMember
 
-from .test_utils import mock_client
+from .test_utils import export_page, mock_client
 
 
 class TestClass:
@@ -242,7 +249,7 @@ class TestClass:
         )
 
     def test_to_list(self):
-        Taskframe.client.session.get.return_value.json.return_value = (
+        Taskframe.client.session.get.return_value.json.return_value = export_page(
             self.export_tasks_mock_data
         )
         data = self.tf.to_list()
@@ -251,27 +258,92 @@ class TestClass:
 
         Taskframe.client.session.get.assert_called_with(
             f"{API_URL}/tasks/export/",
-            params={"taskframe_id": self.tf.id, "no_page": 1},
+            params={"taskframe_id": self.tf.id, "offset": 0, "limit": 500},
+        )
+
+    def test_iter_tasks(self):
+        Taskframe.client.session.get.return_value.json.side_effect = [
+            {"count": 2, "next": "...", "results": self.export_tasks_mock_data[:1]},
+            {"count": 2, "next": None, "results": self.export_tasks_mock_data[1:]},
+        ]
+        tasks = self.tf.iter_tasks(page_size=1)
+
+        assert next(tasks)["id"] == "abcde"
+        assert [x["id"] for x in tasks] == ["fghi"]
+
+        Taskframe.client.session.get.assert_called_with(
+            f"{API_URL}/tasks/export/",
+            params={"taskframe_id": self.tf.id, "offset": 1, "limit": 1},
+        )
+        Taskframe.client.session.get.return_value.json.side_effect = None
+
+    def test_to_csv(self, tmp_path):
+        Taskframe.client.session.get.return_value.json.return_value = export_page(
+            self.export_tasks_mock_data
         )
+        self.tf.to_csv(tmp_path / "export.csv")
+        df = pd.read_csv(tmp_path / "export.csv")
+        assert list(df.label) == ["label1", "label2"]
 
-    def test_to_csv(self):
-        Taskframe.client.session.get.return_value.json.return_value = (
+    def test_to_csv_gzip(self, tmp_path):
+        Taskframe.client.session.get.return_value.json.return_value = export_page(
             self.export_tasks_mock_data
         )
-        csv = self.tf.to_csv("tmp/test_unit_export.csv")
-        df = pd.read_csv("tmp/test_unit_export.csv")
+        self.tf.to_csv(tmp_path / "export.csv.gz")
+
+        df = pd.read_csv(tmp_path / "export.csv.gz")
         assert list(df.label) == ["label1", "label2"]
+        assert [x.name for x in tmp_path.iterdir()] == ["export.csv.gz"]
+
+        Taskframe.client.session.get.return_value.json.return_value = export_page([])
+        with pytest.raises(ValueError):
+            self.tf.to_csv(tmp_path / "empty.csv")
+        assert [x.name for x in tmp_path.iterdir()] == ["export.csv.gz"]
+
+    def test_to_parquet(self, tmp_path):
+        pyarrow = pytest.importorskip("pyarrow")
+        import pyarrow.parquet
+
+        Taskframe.client.session.get.return_value.json.return_value = export_page(
+            self.export_tasks_mock_data
+        )
+        table = self.tf.to_arrow()
+
+        assert table.column("label").to_pylist() == ['"label1"', '"label2"']
+        assert table.schema.field("created_at").type == pyarrow.timestamp(
+            "us", tz="UTC"
+        )
+
+        self.tf.to_parquet(tmp_path / "export.parquet", row_group_size=1)
+
+        parquet_file = pyarrow.parquet.ParquetFile(tmp_path / "export.parquet")
+        assert parquet_file.metadata.num_row_groups == 2
+        assert parquet_file.read().equals(table)
 
     def test_to_dataframe(self):
-        Taskframe.client.session.get.return_value.json.return_value = (
+        Taskframe.client.session.get.return_value.json.return_value = export_page(
             self.export_tasks_mock_data
         )
 
         df = self.tf.to_dataframe()
 
         assert list(df.label) == ["label1", "label2"]
+        assert df.status.dtype == "category"
+        assert isinstance(df.created_at.dtype, pd.DatetimeTZDtype)
+        assert df.time_spent.dtype == "float64"
+
+        frames = list(self.tf.to_dataframe(chunksize=1))
+        assert [len(frame) for frame in frames] == [1, 1]
+
+        df = concat_dataframes(frames)
+        assert df.status.dtype == "category"
+        assert list(df.status.cat.categories) == ["finished"]
+        assert list(df.label) == ["label1", "label2"]
 
     def test_merge_to_dataframe(self):
+        Taskframe.client.session.get.return_value.json.return_value = export_page(
+            self.export_tasks_mock_data
+        )
         initial_df = pd.read_csv("tests/img_paths.csv")[["path", "identifier"]]
         merged_df = self.tf.merge_to_dataframe(
             initial_df, custom_id_column="identifier"
@@ -293,3 +365,328 @@ class TestClass:
 
         assert list(merged_df.label) == ["label1", "label2"]
         assert list(initial_df.label) == ["", "cat"]
+
+        frames = list(
+            self.tf.merge_to_dataframe(
+                initial_df, custom_id_column="identifier", chunksize=1
+            )
+        )
+        assert [list(frame.label) for frame in frames] == [["label1"], ["label2"]]
+        assert list(frames[0].columns) == ["path", "identifier", "label"]
+
+        frames = self.tf.merge_to_dataframe(
+            pd.read_csv("tests/img_paths.csv", chunksize=1),
+            custom_id_column="identifier",
+        )
+        assert [x for frame in frames for x in frame.label] == ["label1", "label2"]
+
+    def test_iter_tasks_concurrently(self):
+        tasks = [{"id": str(i)} for i in range(10)]
+
+        def get(url, params):
+            offset, limit = params["offset"], min(params["limit"], 3)
+            response = MagicMock(status_code=200)
+            response.json.return_value = {
+                "count": len(tasks),
+                "next": "..." if offset + limit < len(tasks) else None,
+                "results": tasks[offset : offset + limit],
+            }
+            return response
+
+        client = mock_client()
+        client.session.get.side_effect = get
+        tf = Taskframe(id="dummy_id")
+        tf.client = client
+
+        assert list(tf.iter_tasks(page_size=5, concurrency=4)) == tasks
+        assert (
+            sorted(
+                tf.iter_tasks(page_size=5, concurrency=4, ordered=False),
+                key=lambda x: int(x["id"]),
+            )
+            == tasks
+        )
+        offsets = [c[1]["params"]["offset"] for c in client.session.get.call_args_list]
+        assert sorted(offsets[-4:]) == [0, 3, 6, 9]
+
+    def test_sync(self, tmp_path):
+        first_task = dict(self.export_tasks_mock_data[0])
+        first_task["finished_at"] = "2020-01-02T00:00:00Z"
+        second_task = dict(self.export_tasks_mock_data[1])
+        Taskframe.client.session.get.return_value.json.return_value = export_page(
+            [first_task, second_task]
+        )
+        state = self.tf.sync(tmp_path / "state.jsonl")
+
+        Taskframe.client.session.get.assert_called_with(
+            f"{API_URL}/tasks/export/",
+            params={"taskframe_id": self.tf.id, "offset": 0, "limit": 500},
+        )
+        assert state.cursor == "2020-01-02T00:00:00Z"
+        assert sorted(state.tasks) == ["abcde", "fghi"]
+
+        second_task = dict(second_task, label="label1")
+        second_task["finished_at"] = "2020-01-03T00:00:00Z"
+        Taskframe.client.session.get.return_value.json.return_value = export_page(
+            [first_task, second_task]
+        )
+        state = self.tf.sync(tmp_path / "state.jsonl")
+
+        Taskframe.client.session.get.assert_called_with(
+            f"{API_URL}/tasks/export/",
+            params={
+                "taskframe_id": self.tf.id,
+                "finished_at__gte": "2020-01-01T23:50:00Z",
+                "offset": 0,
+                "limit": 500,
+            },
+        )
+        assert [x["id"] for x in state.changed] == ["fghi"]
+
+        state = SyncState.load(tmp_path / "state.jsonl")
+        assert state.cursor == "2020-01-03T00:00:00Z"
+        assert {k: x["label"] for k, x in state.tasks.items()} == {
+            "abcde": "label1",
+            "fghi": "label1",
+        }
+
+        with pytest.raises(ValueError):
+            Taskframe(id="other_id").sync(tmp_path / "state.jsonl")
+
+    def test_sync_local(self, tmp_path):
+        first_task = dict(self.export_tasks_mock_data[0], worker="sam@worker.com")
+        first_task["finished_at"] = "2020-01-02T00:00:00Z"
+        second_task = dict(self.export_tasks_mock_data[1], status="pending_work")
+        Taskframe.client.session.get.return_value.json.return_value = export_page(
+            [first_task, second_task]
+        )
+        db = self.tf.sync_local(tmp_path / "tasks.db")
+
+        assert db.cursor == "2020-01-02T00:00:00Z"
+        assert len(db) == 2
+        assert db.custom_ids(status="pending_work") == ["bar"]
+        assert db.count_by("worker", status="finished") == {"sam@worker.com": 1}
+        db.close()
+
+        second_task = dict(second_task, status="finished", label={"classes": ["a"]})
+        second_task["finished_at"] = "2020-01-03T00:00:00Z"
+        Taskframe.client.session.get.return_value.json.return_value = export_page(
+            [second_task]
+        )
+        db = self.tf.sync_local(tmp_path / "tasks.db")
+
+        Taskframe.client.session.get.assert_called_with(
+            f"{API_URL}/tasks/export/",
+            params={
+                "taskframe_id": self.tf.id,
+                "finished_at__gte": "2020-01-01T23:50:00Z",
+                "offset": 0,
+                "limit": 500,
+            },
+        )
+        assert db.cursor == "2020-01-03T00:00:00Z"
+        assert db.count(status="finished") == 2
+        assert db.get(custom_id="bar")["label"] == {"classes": ["a"]}
+        assert db.get(custom_id="missing") is None
+        with pytest.raises(ValueError):
+            db.filter(unknown_field="foo")
+        db.close()
+
+    def test_upsert_interrupted(self, tmp_path):
+        def tasks():
+            yield dict(
+                self.export_tasks_mock_data[0], finished_at="2020-01-05T00:00:00Z"
+            )
+            raise requests.ConnectionError()
+
+        db = TaskDatabase(tmp_path / "tasks.db", taskframe_id=self.tf.id)
+        with pytest.raises(requests.ConnectionError):
+            db.upsert(tasks(), chunk_size=1)
+
+        assert len(db) == 1
+        assert db.cursor is None
+        db.close()
+
+    def test_download_inputs(self, tmp_path):
+        contents = {"https://files/a.jpg": b"aaa", "https://files/b.jpg": b"aaa"}
+
+        def get(url, stream):
+            response = MagicMock()
+            response.__enter__.return_value = response
+            response.iter_content.return_value = [contents[url.split("?")[0]]]
+            response.headers = {"Content-Length": "3"}
+            return response
+
+        session = MagicMock()
+        session.get.side_effect = get
+        client = mock_client()
+        client.create_session = lambda: session
+        client.session.get.return_value.json.return_value = export_page(
+            [
+                {"id": "1", "input_file": "https://files/a.jpg"},
+                {"id": "2", "input_file": "https://files/b.jpg"},
+                {"id": "3", "input_data": "some text"},
+            ]
+        )
+        tf = Taskframe(id="dummy_id")
+        tf.client = client
+
+        paths = tf.download_inputs(tmp_path / "inputs", concurrency=2)
+
+        assert sorted(paths) == ["1", "2"]
+        assert paths["1"] == paths["2"]
+        assert paths["1"].read_bytes() == b"aaa"
+        assert session.get.call_count == 2
+
+        paths = tf.download_inputs(tmp_path / "inputs", concurrency=2)
+        assert session.get.call_count == 2
+
+        # Signed urls change on every export, the files are cached by task id.
+        client.session.get.return_value.json.return_value = export_page(
+            [
+                {"id": "1", "input_file": "https://files/a.jpg?signature=2"},
+                {"id": "2", "input_file": "https://files/b.jpg?signature=2"},
+            ]
+        )
+        paths = tf.download_inputs(tmp_path / "inputs", concurrency=2)
+        assert sorted(paths) == ["1", "2"]
+        assert session.get.call_count == 2
+
+        paths["1"].write_bytes(b"truncated!")
+        contents["https://files/a.jpg"] = b"a"
+        paths = tf.download_inputs(tmp_path / "inputs", concurrency=1)
+        assert isinstance(paths["1"], DownloadError)
+        assert paths["2"].read_bytes() == b"aaa"
+        assert session.get.call_count == 4
+
+        contents["https://files/a.jpg"] = b"aaa"
+        paths = tf.download_inputs(tmp_path / "inputs", concurrency=1)
+        assert paths["1"] == paths["2"]
+        assert session.get.call_count == 4  # the shared object was restored by b.jpg
+
+    def test_dispose_tasks(self, monkeypatch):
+        client = mock_client()
+        client.session.get.return_value.json.return_value = export_page(
+            self.export_tasks_mock_data
+        )
+        monkeypatch.setattr(Task, "client", client)
+
+        outcomes = self.tf.dispose_tasks(status="pending_work")
+
+        assert outcomes == {"abcde": None, "fghi": None}
+        client.session.get.assert_called_with(
+            f"{API_URL}/tasks/",
+            params={
+                "taskframe_id": self.tf.id,
+                "status": "pending_work",
+                "offset": 0,
+                "limit": 500,
+            },
+        )
+        client.session.post.assert_any_call(f"{API_URL}/tasks/abcde/dispose/")
+
+        with pytest.raises(InvalidParameter):
+            self.tf.dispose_tasks()
+        outcomes = self.tf.dispose_tasks(all=True)
+        assert outcomes == {"abcde": None, "fghi": None}
+
+    def test_iter_finished(self, monkeypatch):
+        sleeps = []
+        monkeypatch.setattr("taskframe.taskframe.time.sleep", sleeps.append)
+        first_task = dict(self.export_tasks_mock_data[0])
+        first_task["finished_at"] = "2020-01-02T00:00:00Z"
+        second_task = dict(self.export_tasks_mock_data[1])
+        second_task["finished_at"] = "2020-01-03T00:00:00Z"
+        polls = [[first_task], [first_task], [first_task], [first_task, second_task]]
+        export_params = []
+
+        def get(url, params=None):
+            response = MagicMock(status_code=200)
+            if url.endswith("/tasks/export/"):
+                export_params.append(params)
+                results = polls.pop(0) if polls else [second_task]
+                response.json.return_value = export_page(results)
+            else:
+                response.json.return_value = {
+                    "num_tasks": 2,
+                    "num_pending_work": 0,
+                    "num_pending_review": 1 if polls else 0,
+                    "num_finished": 1 if polls else 2,
+                }
+            return response
+
+        client = mock_client()
+        client.session.get.side_effect = get
+        monkeypatch.setattr(Taskframe, "client", client)
+        tf = Taskframe(id="dummy_id")
+
+        tasks = list(tf.iter_finished(poll=1, max_poll=3))
+
+        assert [task["id"] for task in tasks] == ["abcde", "fghi"]
+        assert sleeps == [1, 2, 3, 1]
+        assert "finished_at__gte" not in export_params[0]
+        assert export_params[-1]["finished_at__gte"] == "2020-01-02T23:59:00Z"
+        assert export_params[-1]["status"] == "finished"
+
+        assert tf.progress()["num_finished"] == 2
+
+    def test_iter_finished_unfinished_task(self, monkeypatch):
+        sleeps = []
+        monkeypatch.setattr("taskframe.taskframe.time.sleep", sleeps.append)
+        first_task = dict(self.export_tasks_mock_data[0])
+        first_task["finished_at"] = "2020-01-02T00:00:00Z"
+        num_pending = [1, 1, 0, 0]
+
+        def get(url, params=None):
+            response = MagicMock(status_code=200)
+            if url.endswith("/tasks/export/"):
+                response.json.return_value = export_page([first_task])
+            else:
+                # The second task is disposed after a while, and never finishes.
+                response.json.return_value = {
+                    "num_tasks": 2,
+                    "num_pending_work": num_pending.pop(0),
+                    "num_pending_review": 0,
+                    "num_finished": 1,
+                }
+            return response
+
+        client = mock_client()
+        client.session.get.side_effect = get
+        monkeypatch.setattr(Taskframe, "client", client)
+
+        tasks = list(Taskframe(id="dummy_id").iter_finished(poll=1, max_poll=2))
+
+        assert [task["id"] for task in tasks] == ["abcde"]
+        assert sleeps == [1, 2, 2, 1]
+        assert num_pending == []
+
+    def test_iter_finished_during_progress(self, monkeypatch):
+        monkeypatch.setattr("taskframe.taskframe.time.sleep", lambda seconds: None)
+        first_task = {"id": "a", "finished_at": "2020-01-02T00:00:00Z"}
+        second_task = {"id": "b", "finished_at": "2020-01-03T00:00:00Z"}
+        polls = [[first_task], [], [second_task], [], []]
+
+        def get(url, params=None):
+            response = MagicMock(status_code=200)
+            if url.endswith("/tasks/export/"):
+                response.json.return_value = export_page(polls.pop(0))
+            else:
+                # b finished between the second poll and this progress call,
+                # and a third task was disposed.
+                response.json.return_value = {
+                    "num_tasks": 3,
+                    "num_pending_work": 0,
+                    "num_pending_review": 0,
+                    "num_finished": 2,
+                }
+            return response
+
+        client = mock_client()
+        client.session.get.side_effect = get
+        monkeypatch.setattr(Taskframe, "client", client)
+
+        tasks = list(Taskframe(id="dummy_id").iter_finished(poll=1))
+
+        assert [task["id"] for task in tasks] == ["a", "b"]
+        assert polls == []
@@ -1,4 +1,13 @@
-from taskframe.utils import remove_empty_values
+import threading
+import time
+
+import pytest
+from taskframe.utils import (
+    atomic_open,
+    is_url,
+    map_concurrently,
+    remove_empty_values,
+)
 
 
 class TestUtils:
@@ -8,3 +17,48 @@ class TestUtils:
         )
 
         assert resp == {"foo": "bar", "nested": {"fizz": False, "keep": True}}
+
+    def test_is_url(self):
+        assert is_url("https://example.com/img.jpg?size=large")
+        assert is_url("HTTP://localhost:8000/")
+        assert is_url("ftp://127.0.0.1")
+        assert not is_url("example.com/img.jpg")
+        assert not is_url("https://example.com/some path")
+        assert not is_url("")
+        assert is_url("https://example.com")
+        assert is_url("https://example.com?size=large")
+        assert not is_url("https://example.com/img.jpg\t")
+        assert not is_url("https://exa_mple.com/img.jpg")
+
+    def test_map_concurrently(self):
+        in_flight = []
+        lock = threading.Lock()
+
+        def square(x):
+            with lock:
+                in_flight.append(x)
+            time.sleep(0.01 * (x % 3))
+            return x * x
+
+        results = map_concurrently(square, iter(range(20)), concurrency=4)
+        assert next(results) == 0
+        assert len(in_flight) <= 5
+        assert list(results) == [x * x for x in range(1, 20)]
+
+        unordered = map_concurrently(square, range(20), concurrency=4, ordered=False)
+        assert sorted(unordered) == [x * x for x in range(20)]
+
+    def test_atomic_open(self, tmp_path):
+        path = tmp_path / "output.txt"
+        path.write_text("previous")
+
+        with pytest.raises(RuntimeError):
+            with atomic_open(path) as output_file:
+                output_file.write("partial")
+                raise RuntimeError()
+        assert path.read_text() == "previous"
+
+        with atomic_open(path) as output_file:
+            output_file.write("complete")
+        assert path.read_text() == "complete"
+        assert [x.name for x in tmp_path.iterdir()] == ["output.txt"]
@@ -17,4 +17,10 @@ def mock_client():
     client.session.post.return_value.status_code = 200
     client.session.get.return_value.status_code = 200
     client.session.put.return_value.status_code = 200
+    client.session.patch.return_value.status_code = 200
     return client
+
+
+def export_page(results):
+    """Returns a single page of the paginated list endpoints holding results."""
+    return {"count": len(results), "next": None, "previous": None, "results": results}